@@ -23,38 +23,24 @@
 # In[1]:
 
 
-from csv import reader
+from app_profiles import read_header, read_rows
 
 ### The Google Play data set ###
-opened_file = open('googleplaystore.csv')
-read_file = reader(opened_file)
-android = list(read_file)
-android_header = android[0]
-android = android[1:]
+android_header = read_header('googleplaystore.csv')
+android = list(read_rows('googleplaystore.csv'))
 
 ### The App Store data set ###
-opened_file = open('AppleStore.csv')
-read_file = reader(opened_file)
-ios = list(read_file)
-ios_header = ios[0]
-ios = ios[1:]
+ios_header = read_header('AppleStore.csv')
+ios = list(read_rows('AppleStore.csv'))
 
 
-# In order to facilitate the exploration of the two datasets, we will initially develop a function called `explore_data()`. This function will enable us to navigate through rows in a clearer format, and we'll incorporate an option within the function to display the count of rows and columns for any given dataset.
+# In order to facilitate the exploration of the two datasets, we will use the `explore_data()` function from the `app_profiles` package. This function will enable us to navigate through rows in a clearer format, and we'll incorporate an option within the function to display the count of rows and columns for any given dataset.
 
 # In[2]:
 
 
-def explore_data(dataset, start, end, rows_and_columns=False):
-    dataset_slice = dataset[start:end]    
-    for row in dataset_slice:
-        print(row)
-        print('\n') # adds a new (empty) line after each row
+from app_profiles import explore_data
 
-    if rows_and_columns:
-        print('Number of rows:', len(dataset))
-        print('Number of columns:', len(dataset[0]))
-        
 print(android_header)
 print('\n')
 explore_data(android, 0, 3, True)
@@ -89,13 +75,24 @@ print(android[0]) #correct row
 
 
 # The row 10,472 corresponds to the app 'Life Made WI-Fi Touchscreen Photo Frame', and its rating is 19, which is not possible as the maximum rating is supposed to be 5. This issue shows that there is a missing value in the 'Category' column. Therefore, we'll delete this row.
+# 
+# Rather than deleting index 10,472 by hand (which would remove a correct row if we ran it twice, or if a fresh export put the bad row somewhere else), we check every row against the header: `validated()` drops rows with the wrong number of columns, unparseable numbers, ratings outside 0-5 or badly formatted prices, and tells us why it dropped each one. `ANDROID_CHECKED` lists the columns that need a check: every column of those we're going to use that we parse as a number, and the ones with a rule.
 
 # In[5]:
 
 
+from app_profiles import ANDROID_CHECKED, ANDROID_SCHEMA, validated
+
+android_rejects = []
+
+def reject_android(index, reason, row):
+    android_rejects.append((index, reason, row))
+
 print(len(android))
-del android[10472] # don't run this more than once
+android = list(validated(android, android_header, ANDROID_SCHEMA, reject_android,
+                         ANDROID_CHECKED))
 print(len(android))
+print(android_rejects)
 
 
 # # Removing Duplicate Entries
@@ -111,88 +108,57 @@ for app in android:
         print(app)
 
 
-# In total, there are 1,181 cases of duplicate entries:
+# In total, there are 1,181 cases of duplicate entries. Checking `name in unique_apps` against a growing list makes this count quadratic in the number of rows, so we use the `dedup()` function from the `app_profiles` package instead: it walks the data set once and keeps a dictionary keyed by app name.
 
 # In[7]:
 
 
-duplicate_apps = []
-unique_apps = []
+from app_profiles import by_reviews, dedup
 
-for app in android:
-    name = app[0]
-    if name in unique_apps:
-        duplicate_apps.append(name)
-    else:
-        unique_apps.append(name)
-        
-print('Number of duplicate apps:', len(duplicate_apps))
+android_clean, dedup_report = dedup(android, score=by_reviews)
+
+print('Number of duplicate apps:', dedup_report['duplicates'])
 print('\n')
-print('Examples of duplicate apps:', duplicate_apps[:15])
+print('Examples of duplicate apps:', dedup_report['examples'])
 
 
 # Before analyzing the data, we should remove any duplicate entries so as to avoid counting any apps more than once. One way to do this is by removing the duplicate rows randomly, but there is a better way.
 # 
 # If you examine the rows that we printed two cells above for the Instagram app, the main difference happens on the fourth position of each row, which corresponds to the number of reviews. The different numbers show the data was collected at different times. We can use this to build a criterion for removing the duplicates. Instead of removing duplicates randomly, we'll only keep the row with the highest number of reviews as this means that the data is the most recent, hence, is more reliable than others. As for the latter, we'll remove them.
 # 
-# To do that, we will:
+# This is what `dedup()` did in the cell above, in the same pass that counted the duplicates:
 # 
-# + Create a dictionary where each key is a unique app name, and the value is the highest number of reviews of that app
-# + Use the dictionary to create a new data set, which will have only one entry per app (and we only select the apps with the highest number of reviews)
+# + It keeps a dictionary where each key is a unique app name, and the value is the highest number of reviews of that app together with the row it was found in
+# + When several rows share the highest number of reviews (for example, the Box app has three entries with the same number of reviews), the first one wins, so we end up with exactly one entry per app
+# + The winning rows are returned in their original order as `android_clean`
+# 
+# The `score=by_reviews` argument is the "keep the row with the highest X" policy; any other function of a row (a crawl timestamp, for instance) can be passed instead.
 
 # # Part Two
-# ## Let's begin by creating a dictionary
-
-# In[8]:
-
-
-reviews_max = {}
-
-for app in android:
-    name = app[0]
-    n_reviews = float(app[3])
-    
-    if name in reviews_max and reviews_max[name] < n_reviews:
-        reviews_max[name] = n_reviews
-        
-    elif name not in reviews_max:
-        reviews_max[name] = n_reviews
-    
-
-
-# In the previous code cell, we have found 1,181 cases of duplicate entries. Hence, we should expect that the length of our dictionary be equal to the difference between the length of the data set and 1,181.
+# We have found 1,181 cases of duplicate entries. Hence, we should expect that the length of the cleaned data set be equal to the difference between the length of the data set and 1,181.
 
 # In[9]:
 
 
-print('Expected length:', len(android) - 1181)
-print('Actual length:', len(reviews_max))
+print('Expected length:', len(android) - dedup_report['duplicates'])
+print('Actual length:', len(android_clean))
 
 
-# Now, let's use the `reviews_max` dictionary to remove the duplicate rows. In the code cell below:
-# 
-# + We will start by creating two empty lists, `android_clean` and `already_added`.
-# + We loop through the Google Play dataset, and for each iteration, do the following: 
-#     + Isolate the name of the app and the number of reviews
-#     + Append the entire row to the `android_clean` list (which will eventually be a list of lists and store our cleaned data set), and
-#     + Append the name of the app name to the `already_added` list - this helps us to keep track of apps that we already added, if:
-#         + `n_reviews` is the same as the number of maximum reviews of the app name, and
-#         + name is not already in the list `already_added`. We need to add this supplementary condition to account for those cases where the highest number of reviews of a duplicate app is the same for more than one entry (for example, the Box app has three entries, and the number of reviews is the same). If we just check for `reviews_max[name] == n_reviews`, we'll still end up with duplicate entries for some apps.
+# Exact name matches don't catch every duplicate: the same app may be listed as 'Sudoku Free' in one crawl and 'Sudoku – Free 🎲' in another. `fuzzy_dedup()` groups names that are the same once case, symbols, punctuation and filler words like 'free' are dropped, or whose spelling is at least 80% similar, and keeps the most reviewed row of each group just like `dedup()`. Let's see how many near duplicates the exact deduplication leaves in:
 
-# In[10]:
+# In[ ]:
 
 
-android_clean = []
-already_added = []
+from app_profiles import fuzzy_dedup
 
-for app in android:
-    name = app[0]
-    n_reviews = float(app[3])
-    if (reviews_max[name] == n_reviews) and (name not in already_added):
-        android_clean.append(app)
-        already_added.append(name) # make sure this is inside the if block
+android_near_clean, near_report = fuzzy_dedup(android_clean, score=by_reviews)
 
+print('Near-duplicate rows fuzzy_dedup would remove:', near_report['duplicates'])
+print('Examples:', near_report['examples'][:5])
 
+
+# This check is informational only: fuzzy matching can also merge distinct apps with similar names, so the rest of the analysis keeps working with the exact deduplication in `android_clean`, and `android_near_clean` is not used further.
+# 
 # Now, let's quickly explore the data set, and confirm that it has 9,659 rows.
 
 # In[11]:
@@ -274,56 +240,75 @@ print(is_english('Instachat 😜'))
 
 
 # Our filter function is still not perfect, but it should be fairly effective.
-# Below, we use the updated `is_english()` function to filter out the non-English apps for both data sets:
+# 
+# So far every step built a new list of rows, and every row is still a list of strings, so any numeric analysis would have to call `float()` on the same values again and again. Before filtering further, we parse the validated, deduplicated data sets once into typed columns, named after the header rows: numbers are stored in compact arrays and repeated labels such as genres are interned. We only parse the columns we're going to use (`ANDROID_COLUMNS` and `IOS_COLUMNS`).
+
+# In[ ]:
+
+
+from app_profiles import ANDROID_COLUMNS, IOS_CHECKED, IOS_COLUMNS, IOS_SCHEMA, columnar
+
+android_all = columnar(android_clean, android_header, ANDROID_SCHEMA, ANDROID_COLUMNS)
+ios_all = columnar(validated(ios, ios_header, IOS_SCHEMA, columns=IOS_CHECKED),
+                   ios_header, IOS_SCHEMA, IOS_COLUMNS)
+
+
+# Below, we filter out the non-English apps for both data sets. Instead of building a filtered copy of the data set for every step, we describe the steps as a `Query` over the columns: filters are only recorded, and when we ask for a result they are all checked together in a single pass. For the English check, `english_classifier()` applies the same rule as `is_english()`, but answers pure-ASCII names without looking at their characters and caches the answer for every other name.
 
 # In[16]:
 
 
-android_english = []
-ios_english = []
+from app_profiles import Query, col, english_classifier
 
-for app in android_clean:
-    name = app[0]
-    if is_english(name):
-        android_english.append(app)
-        
-for app in ios:
-    name = app[1]
-    if is_english(name):
-        ios_english.append(app)
-        
-explore_data(android_english, 0, 3, True)
-print('\n')
-explore_data(ios_english, 0, 3, True)
+english = english_classifier()
+android_english = Query(android_all).filter(col('App').apply(english))
+ios_english = Query(ios_all).filter(col('track_name').apply(english))
+
+print(android_english.count())
+print(ios_english.count())
 
 
 # We can see that we now have 9,614 Android apps and 6,183 iOS apps.
 
 # # Isolating The Free Apps
-# As mentioned in the introduction, we only build apps that are free to download and install, and our main source of revenue consists of in-app ads. Our datasets contain both free and non-free apps; we'll need to isolate only the free apps for our analysis.
+# As mentioned in the introduction, we only build apps that are free to download and install, and our main source of revenue consists of in-app ads. Our datasets contain both free and non-free apps; we'll need to isolate only the free apps for our analysis. We extend the English queries with a price filter, and only now materialise the matching rows as the columns the rest of the analysis reads.
 
 # In[17]:
 
 
-android_final = []
-ios_final = []
+android_free = android_english.filter(col('Price') == 0)
+ios_free = ios_english.filter(col('price') == 0)
 
-for app in android_english:
-    price = app[7]
-    if price == '0':
-        android_final.append(app)
-        
-for app in ios_english:
-    price = app[4]
-    if price == '0.0':
-        ios_final.append(app)
-        
-print(len(android_final))
-print(len(ios_final))
-    
+android_columns = android_free.collect()
+ios_columns = ios_free.collect()
+
+print(len(android_columns['App']))
+print(len(ios_columns['track_name']))
 
 
 # We're left with 8864 Android apps and 3222 iOS apps, which should be enough for our analysis.
+# 
+# Now that we know what the cleaning involves, we can also run it as a single streaming pipeline straight from the CSV files: rows are read lazily and flow through the bad-row, dedup, English and free filters one at a time, and only the final result is materialised. This keeps memory flat however large the exports get, and keeps the same apps:
+
+# In[ ]:
+
+
+from app_profiles import android_pipeline, ios_pipeline
+
+print([app[0] for app in android_pipeline('googleplaystore.csv')] == android_columns['App'])
+print([app[0] for app in ios_pipeline('AppleStore.csv')] == ios_columns['id'])
+
+
+# Later on we'll drill down into single genres and categories many times. Instead of scanning a whole data set for each of these queries, we index the row ids by genre and category once, with the Google Play rows of each category also ordered by their number of installs.
+
+# In[ ]:
+
+
+from app_profiles import group_index, group_ordered_index, range_ids
+
+ios_by_genre = group_index(ios_columns['prime_genre'])
+android_by_category = group_ordered_index(android_columns['Category'],
+                                          android_columns['Installs'])
 
 # # Most Common Apps by Genre
 # ## Part One
@@ -341,44 +326,20 @@ print(len(ios_final))
 # 
 
 # # Part Two
-# We'll build two functions we can use to analyze the frequency tables:
+# We'll use two functions from the `app_profiles` package to analyze the frequency tables:
 # + One function to generate frequency tables that show percentages
 # + Another function we can use to display the percentages in a descending order
+# 
+# Both work on lists of rows. For the typed columns we built above, `display_column()` does the same job on a whole column at once; label columns loaded from the on-disk cache are already stored as integer codes, and those are counted in a single NumPy step.
+# 
+# We'll look at these tables more than once, so we ask for them through a `ResultCache`: a table is computed the first time it's asked for and served from memory afterwards, until the data it was computed from changes.
 
 # In[18]:
 
 
-def freq_table(dataset, index):
-    table = {}
-    total = 0
-    
-    for row in dataset:
-        total += 1
-        value = row[index]
-        if value in table:
-            table[value] += 1
-        else:
-            table[value] = 1
-    
-    table_percentages = {}
-    for key in table:
-        percentage = (table[key] / total) * 100
-        table_percentages[key] = percentage 
-    
-    return table_percentages
+from app_profiles import ResultCache
 
-
-def display_table(dataset, index):
-    table = freq_table(dataset, index)
-    table_display = []
-    for key in table:
-        key_val_as_tuple = (table[key], key)
-        table_display.append(key_val_as_tuple)
-        
-    table_sorted = sorted(table_display, reverse = True)
-    for entry in table_sorted:
-        print(entry[1], ':', entry[0])
-    
+results = ResultCache()
 
 
 # # Part Three
@@ -387,7 +348,7 @@ def display_table(dataset, index):
 # In[19]:
 
 
-display_table(ios_final, -5)
+results.display_column(ios_columns['prime_genre'])
 
 
 # We can clearly see that the most common genre among the free English apps is Games, at 58.2%. Entertainment comes next at 7.9%, followed by Photo & Video at 5.0%, Education at 3.7%, and Social Networking at 3.3%.
@@ -399,7 +360,7 @@ display_table(ios_final, -5)
 # In[20]:
 
 
-display_table(android_final, 1) # Category
+results.display_column(android_columns['Category'])
 
 
 # Looking at the results in the cell above, we can see that there are more apps in the Google Play data set which are centred around practical purposes such as family, tools, business, lifestyle and productivity. This is the opposite of the situation for the App Store. However, upon doing a quick research on Google Play, we can see that games for kids mostly make up the majority of the family category. 
@@ -409,7 +370,7 @@ display_table(android_final, 1) # Category
 # In[21]:
 
 
-display_table(android_final, -4)
+results.display_column(android_columns['Genres'])
 
 
 # The difference between the Genres and the Category columns is not crystal clear, but one thing we can notice is that the Genres column is much more granular (it has more categories). We're only looking for the bigger picture at the moment, so we'll only work with the Category column moving forward.
@@ -419,24 +380,15 @@ display_table(android_final, -4)
 # # Most Popular Apps by Genre on the App Store
 # One way to find out what genres are the most popular (have the most users) is to calculate the average number of installs for each app genre. For the Google Play dataset, we can find this information in the Installs column, but this information is missing for the App Store dataset. As a workaround, we'll take the total number of user ratings as a proxy, which we can find in the rating_count_tot app.
 # 
-# Let's start with calculating the average number of user ratings per app genre on the App Store.
+# Let's start with calculating the average number of user ratings per app genre on the App Store. Rather than looping over the whole data set once for every genre, we ask the `ResultCache` for a `group_by()` of the free English columns, which collects the count, sum, mean, median (and any quantiles we ask for) of every genre in a single pass; when we need these figures again later, they are served from memory.
 
 # In[22]:
 
 
-genres_ios = freq_table(ios_final, -5)
+genres_ios = results.group_by(ios_columns['prime_genre'], ios_columns['rating_count_tot'])
 
 for genre in genres_ios:
-    total = 0
-    len_genre = 0
-    for app in ios_final:
-        genre_app = app[-5]
-        if genre_app == genre:
-            n_ratings = float(app[5])
-            total += n_ratings
-            len_genre += 1
-    avg_n_ratings = total / len_genre
-    print(genre, ':', avg_n_ratings)
+    print(genre, ':', genres_ios[genre]['mean'])
 
 
 # On average, navigation apps have the highest number of user reviews, but this figure is heavily influenced by Waze and Google Maps, which have close to half a million user reviews together:
@@ -444,9 +396,8 @@ for genre in genres_ios:
 # In[23]:
 
 
-for app in ios_final:
-    if app[-5] == 'Navigation':
-        print(app[1], ':', app[5]) # print name and number of ratings
+for i in ios_by_genre['Navigation']:
+    print(ios_columns['track_name'][i], ':', ios_columns['rating_count_tot'][i]) # print name and number of ratings
 
 
 # The same pattern applies to social networking apps, where the average number is heavily influenced by a few giants like Facebook, Pinterest, Skype, etc. Same applies to music apps, where a few big players like Pandora, Spotify, and Shazam heavily influence the average number.
@@ -458,9 +409,8 @@ for app in ios_final:
 # In[24]:
 
 
-for app in ios_final:
-    if app[-5] == 'Reference':
-        print(app[1], ':', app[5])
+for i in ios_by_genre['Reference']:
+    print(ios_columns['track_name'][i], ':', ios_columns['rating_count_tot'][i])
 
 
 # However, this niche seems to show some potential. One thing we could do is take another popular book and turn it into an app where we could add different features besides the raw version of the book. This might include daily quotes from the book, an audio version of the book, quizzes about the book, etc. On top of that, we could also embed a dictionary within the app, so users don't need to exit our app to look up words in an external app.
@@ -483,31 +433,20 @@ for app in ios_final:
 # In[25]:
 
 
-display_table(android_final, 5) # the Installs columns
+results.display_column(android_columns['Installs'])
 
 
 # For instance, we don't know whether an app with 100,000+ installs has 100,000 installs, 200,000, or 350,000. However, we don't need very precise data for our purposes — we only want to find out which app genres attract the most users.
 # 
-# We're going to leave the numbers as they are, which means that we'll consider that an app with 100,000+ installs has 100,000 installs, and an app with 1,000,000+ installs has 1,000,000 installs, and so on. To perform computations, however, we'll need to convert each install number from a string to a float. This means we need to remove the commas and the plus characters, or the conversion will fail and cause an error. We'll do this directly in the loop below, where we also compute the average number of installs for each genre (category).
+# We're going to leave the numbers as they are, which means that we'll consider that an app with 100,000+ installs has 100,000 installs, and an app with 1,000,000+ installs has 1,000,000 installs, and so on. To perform computations, however, we need each install number as a number rather than a string like '1,000,000+'. The `Installs` column of `android_columns` already holds these integers (the commas and plus characters were stripped once, when the columns were built), so the loop below can compute the average number of installs for each genre (category) directly.
 
 # In[26]:
 
 
-categories_android = freq_table(android_final, 1)
+categories_android = results.group_by(android_columns['Category'], android_columns['Installs'])
 
 for category in categories_android:
-    total = 0
-    len_category = 0
-    for app in android_final:
-        category_app = app[1]
-        if category_app == category:
-            n_installs = app[5]
-            n_installs = n_installs.replace(',', '')
-            n_installs = n_installs.replace('+', '')
-            total += float(n_installs)
-            len_category += 1
-    avg_n_installs = total / len_category
-    print(category, ':', avg_n_installs)
+    print(category, ':', categories_android[category]['mean'])
 
 
 # On average, communication apps have the most installs: 38,456,119. This number is heavily skewed up by a few apps that have over one billion installs (WhatsApp, Facebook Messenger, Skype, Google Chrome, Gmail, and Hangouts), and a few others with over 100 and 500 million installs:
@@ -515,11 +454,8 @@ for category in categories_android:
 # In[27]:
 
 
-for app in android_final:
-    if app[1] == 'COMMUNICATION' and (app[5] == '1,000,000,000+'
-                                     or app[5] == '500,000,000+'
-                                     or app[5] == '100,000,000+'):
-        print(app[0], ':', app[5])
+for i in range_ids(android_by_category['COMMUNICATION'], low=100000000):
+    print(android_columns['App'][i], ':', android_columns['Installs'][i])
 
 
 # If we removed all the communication apps that have over 100 million installs, the average would be reduced roughly ten times:
@@ -527,16 +463,27 @@ for app in android_final:
 # In[28]:
 
 
-under_100_m = []
+(Query(android_columns)
+ .filter((col('Category') == 'COMMUNICATION') & (col('Installs') < 100000000))
+ .mean('Installs'))
 
-for app in android_final:
-    n_installs = app[5]
-    n_installs = n_installs.replace(',', '')
-    n_installs = n_installs.replace('+', '')
-    if (app[1] == 'COMMUNICATION') and (float(n_installs) < 100000000):
-        under_100_m.append(float(n_installs))
-        
-sum(under_100_m) / len(under_100_m)
+
+# Rather than removing the giants genre by genre, we can ask for skew-resistant figures for every genre and category at once. `robust_stats()` (also asked through the cache) reports the median, the mean without the top and bottom 10% (the trimmed mean), and the mean without outliers (here also leaving out apps with 100 million installs or more, as we just did for communication apps), and `robust_ranking()` orders the groups by any of them:
+
+# In[ ]:
+
+
+from app_profiles import robust_ranking
+
+robust_android = results.robust_stats(android_columns['Category'], android_columns['Installs'],
+                                      limit=100000000)
+for value, category in robust_ranking(robust_android, 'outlier_mean'):
+    print(category, ':', value)
+
+print('\n')
+robust_ios = results.robust_stats(ios_columns['prime_genre'], ios_columns['rating_count_tot'])
+for value, genre in robust_ranking(robust_ios, 'trimmed_mean'):
+    print(genre, ':', value)
 
 
 # We see the same pattern for the video players category, which is the runner-up with 24,727,872 installs. The market is dominated by apps like Youtube, Google Play Movies & TV, or MX Player. The pattern is repeated for social apps (where we have giants like Facebook, Instagram, Google+, etc.), photography apps (Google Photos and other popular photo editors), or productivity apps (Microsoft Word, Dropbox, Google Calendar, Evernote, etc.).
@@ -547,14 +494,15 @@ sum(under_100_m) / len(under_100_m)
 # 
 # The books and reference genre looks fairly popular as well, with an average number of installs of 8,767,811. It's interesting to explore this in more depth, since we found this genre has some potential to work well on the App Store, and our aim is to recommend an app genre that shows potential for being profitable on both the App Store and Google Play.
 # 
-# Let's take a look at some of the apps from this genre and their number of installs:
+# Let's take a look at some of the apps from this genre and their number of installs. This listing is long, so rather than calling `print()` once per app we hand the lines to `write_lines()`, which writes them in large batches (its `limit` argument would cut the listing short, and `export_rows()` / `export_table()` write whole slices to CSV or JSON files instead):
 
 # In[29]:
 
 
-for app in android_final:
-    if app[1] == 'BOOKS_AND_REFERENCE':
-        print(app[0], ':', app[5])
+from app_profiles import write_lines
+
+write_lines('%s : %s' % (android_columns['App'][i], android_columns['Installs'][i])
+            for i in range_ids(android_by_category['BOOKS_AND_REFERENCE']))
 
 
 # The book and reference genre includes a variety of apps: software for processing and reading ebooks, various collections of libraries, dictionaries, tutorials on programming or languages, etc. It seems there's still a small number of extremely popular apps that skew the average:
@@ -562,11 +510,8 @@ for app in android_final:
 # In[30]:
 
 
-for app in android_final:
-    if app[1] == 'BOOKS_AND_REFERENCE' and (app[5] == '1,000,000,000+'
-                                            or app[5] == '500,000,000+'
-                                            or app[5] == '100,000,000+'):
-        print(app[0], ':', app[5])
+for i in range_ids(android_by_category['BOOKS_AND_REFERENCE'], low=100000000):
+    print(android_columns['App'][i], ':', android_columns['Installs'][i])
 
 
 # However, it looks like there are only a few very popular apps, so this market still shows potential. Let's try to get some app ideas based on the kind of apps that are somewhere in the middle in terms of popularity (between 1,000,000 and 100,000,000 downloads):
@@ -574,20 +519,44 @@ for app in android_final:
 # In[31]:
 
 
-for app in android_final:
-    if app[1] == 'BOOKS_AND_REFERENCE' and (app[5] == '1,000,000+'
-                                            or app[5] == '5,000,000+'
-                                            or app[5] == '10,000,000+'
-                                            or app[5] == '50,000,000+'):
-        print(app[0], ':', app[5])
+write_lines('%s : %s' % (android_columns['App'][i], android_columns['Installs'][i])
+            for i in range_ids(android_by_category['BOOKS_AND_REFERENCE'], low=1000000, high=100000000))
 
 
+# This niche seems to be dominated by software for processing and reading ebooks, as well as various collections of libraries and dictionaries, so it's probably not a good idea to build similar apps since there'll be some significant competition.
+# 
+# We also notice there are quite a few apps built around the book Quran, which suggests that building an app around a popular book can be profitable. It seems that taking a popular book (perhaps a more recent book) and turning it into an app could be profitable for both the Google Play and the App Store markets.
+# 
+# However, it looks like the market is already full of libraries, so we need to add some special features besides the raw version of the book. This might include daily quotes from the book, an audio version of the book, quizzes on the book, a forum where people can discuss the book, etc.
+
+
+# Let's recall the average popularity of the book-related genres on both markets. These figures come from the same `ResultCache` as the tables above: the per-genre statistics were computed once, in the averages cells, and `info()` shows that asking for them again was served from memory.
+
 # In[ ]:
 
 
-This niche seems to be dominated by software for processing and reading ebooks, as well as various collections of libraries and dictionaries, so it's probably not a good idea to build similar apps since there'll be some significant competition.
+android_means = results.group_by(android_columns['Category'], android_columns['Installs'])
+ios_means = results.group_by(ios_columns['prime_genre'], ios_columns['rating_count_tot'])
+print('BOOKS_AND_REFERENCE :', android_means['BOOKS_AND_REFERENCE']['mean'])
+print('Book :', ios_means['Book']['mean'])
+print('Reference :', ios_means['Reference']['mean'])
+
+info = results.info()
+print('Cache hits:', info.hits, 'misses:', info.misses)
+
 
-We also notice there are quite a few apps built around the book Quran, which suggests that building an app around a popular book can be profitable. It seems that taking a popular book (perhaps a more recent book) and turning it into an app could be profitable for both the Google Play and the App Store markets.
+# So far we have looked at the two markets separately. Since we want a profile that works on both, we can also put them side by side: `market_profiles()` maps each App Store genre onto a Google Play category and reports, per category, the average installs on Google Play next to the average number of user ratings on the App Store. `match_apps()` goes one step further and pairs up the apps that are published on both stores (by normalised name, comparing only apps in the same block), so `matched_profiles()` can report the same metrics for those apps alone.
 
-However, it looks like the market is already full of libraries, so we need to add some special features besides the raw version of the book. This might include daily quotes from the book, an audio version of the book, quizzes on the book, a forum where people can discuss the book, etc.
+# In[ ]:
+
+
+from app_profiles import market_profiles, match_apps, matched_profiles
 
+for category, metrics in market_profiles(android_columns, ios_columns).items():
+    print(category, ':', metrics)
+
+print('\n')
+matches = match_apps(android_columns['App'], android_columns['Category'],
+                     ios_columns['track_name'], ios_columns['prime_genre'])
+for category, metrics in matched_profiles(matches, android_columns, ios_columns).items():
+    print(category, ':', metrics)
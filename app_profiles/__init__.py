@@ -0,0 +1,111 @@
+"""Helpers for the profitable app profiles analysis (see Basics.py).
+
+Importing the package does no I/O; run ``python -m app_profiles`` for the
+command line interface.
+"""
+
+from app_profiles.aggregate import group_by, quantile
+from app_profiles.columns import (
+    ANDROID_COLUMNS,
+    ANDROID_SCHEMA,
+    IOS_COLUMNS,
+    IOS_SCHEMA,
+    columnar,
+    n_rows,
+    parse_price,
+    row_at,
+)
+from app_profiles.dedup import (
+    by_reviews,
+    dedup,
+    dedup_winners,
+    merge_winners,
+    winning_rows,
+)
+from app_profiles.explore import explore_data, explore_page
+from app_profiles.fuzzy import fuzzy_dedup, name_grams, near_duplicate_labels
+from app_profiles.index import (
+    group_index,
+    group_ordered_index,
+    ordered_index,
+    range_ids,
+)
+from app_profiles.installs import (
+    BUCKETS,
+    INSTALL_BOUNDS,
+    InstallBucket,
+    bucket,
+    install_ordinal,
+    parse_installs,
+)
+from app_profiles.language import (
+    EMOJI,
+    SYMBOLS,
+    english_classifier,
+    english_mask,
+    is_english,
+    non_ascii_count,
+)
+from app_profiles.matching import (
+    GENRE_TO_CATEGORY,
+    market_profiles,
+    match_apps,
+    matched_profiles,
+    normalize_name,
+)
+from app_profiles.pipeline import (
+    android_pipeline,
+    deduplicated,
+    english_only,
+    free_only,
+    ios_pipeline,
+    read_header,
+    read_rows,
+    well_formed,
+)
+from app_profiles.memo import CacheInfo, ResultCache
+from app_profiles.query import Column, GroupedQuery, Predicate, Query, col
+from app_profiles.report import (
+    export_rows,
+    export_table,
+    page_of,
+    write_lines,
+)
+from app_profiles.robust import (
+    order_quantile,
+    rank_sum,
+    robust_ranking,
+    robust_stats,
+    select,
+    trimmed_mean,
+)
+from app_profiles.sketches import (
+    FeedSummary,
+    HyperLogLog,
+    SpaceSaving,
+    TDigest,
+    summarize_feed,
+)
+from app_profiles.stages import StageProfiler, stage
+from app_profiles.tables import (
+    code_freq_table,
+    column_freq_table,
+    display_column,
+    display_table,
+    encode,
+    freq_table,
+    percentages,
+    print_table,
+    sorted_table,
+)
+from app_profiles.validate import (
+    ANDROID_CHECKED,
+    FORMATS,
+    IOS_CHECKED,
+    RANGES,
+    checked_columns,
+    compile_checks,
+    reject_writer,
+    row_error,
+    validated,
+)
@@ -0,0 +1,5 @@
+import sys
+
+from app_profiles.cli import main
+
+sys.exit(main())
@@ -0,0 +1,57 @@
+"""Single-pass group-by aggregation.
+
+``group_by`` computes the frequency table of a group column (the same
+percentages ``freq_table`` returns) together with per-group statistics of a
+value column, in one pass over the two columns. Adding a quantile or another
+statistic doesn't add a pass over the data.
+"""
+
+from app_profiles.tables import percentages
+
+
+def quantile(sorted_values, q):
+    """Return the ``q`` quantile of a sorted list, interpolating linearly."""
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def group_by(groups, values, quantiles=()):
+    """Aggregate ``values`` by the matching entries of ``groups``.
+
+    ``groups`` and ``values`` are parallel columns, e.g.
+    ``ios_columns['prime_genre']`` and ``ios_columns['rating_count_tot']``.
+
+    Returns a dict mapping each group to a dict with its 'count', 'percentage'
+    (of all rows), 'sum', 'mean', 'median' and, for every ``q`` in
+    ``quantiles``, the ``q`` quantile under ``stats['quantiles'][q]``.
+    """
+    members = {}
+    total = 0
+
+    for group, value in zip(groups, values):
+        total += 1
+        if group in members:
+            members[group].append(value)
+        else:
+            members[group] = [value]
+
+    counts = {group: len(group_values) for group, group_values in members.items()}
+    shares = percentages(counts, total)
+
+    table = {}
+    for group, group_values in members.items():
+        group_values.sort()
+        group_sum = sum(group_values)
+        table[group] = {
+            'count': counts[group],
+            'percentage': shares[group],
+            'sum': group_sum,
+            'mean': group_sum / counts[group],
+            'median': quantile(group_values, 0.5),
+            'quantiles': {q: quantile(group_values, q) for q in quantiles},
+        }
+
+    return table
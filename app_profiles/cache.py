@@ -0,0 +1,227 @@
+"""On-disk cache of the cleaned data sets.
+
+The first run cleans a data set with ``android_pipeline`` / ``ios_pipeline``,
+parses the columns the analysis reads (``ANDROID_COLUMNS`` /
+``IOS_COLUMNS``) with ``columnar`` and writes each to its own file:
+
++ numeric columns as the raw bytes of their ``array.array``,
++ label columns as integer codes plus the list of distinct labels,
++ text columns as UTF-8 bytes plus the offset of every value.
+
+Later runs memory-map those files instead of reading and cleaning the CSV
+again: numeric columns come back as ``memoryview`` objects over the mapped
+files (``numpy.frombuffer`` can wrap them without a copy), and text is only
+decoded when it is read.
+
+An entry is keyed by the SHA-256 of the source file, the filter settings,
+the validation rules (``RANGES``, ``FORMATS`` and the checked columns), the
+stored columns and the code of the dedup policy, so editing the CSV, a setting or a rule gives a new key and a fresh
+entry. Entry names start with the store, the file name and a hash of the
+absolute path of the source, and the outdated entry for the same source is
+removed when the new one is written.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import shutil
+from array import array
+
+from app_profiles.columns import (
+    ANDROID_COLUMNS,
+    ANDROID_SCHEMA,
+    IOS_COLUMNS,
+    IOS_SCHEMA,
+    columnar,
+)
+from app_profiles.dedup import by_reviews
+from app_profiles.pipeline import android_pipeline, ios_pipeline, read_header
+from app_profiles.validate import ANDROID_CHECKED, FORMATS, IOS_CHECKED, RANGES
+
+CACHE_DIR = '.app_profiles_cache'
+FORMAT_VERSION = 1
+
+STORES = {
+    'android': (android_pipeline, ANDROID_SCHEMA, ANDROID_COLUMNS),
+    'ios': (ios_pipeline, IOS_SCHEMA, IOS_COLUMNS),
+}
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's content."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as opened_file:
+        for chunk in iter(lambda: opened_file.read(chunk_size), b''):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def _rules():
+    """The validation rules and dedup policy the cleaned data depends on."""
+    code = by_reviews.__code__
+    return [sorted((name, repr(bounds)) for name, bounds in RANGES.items()),
+            sorted((name, pattern.pattern) for name, pattern in FORMATS.items()),
+            [ANDROID_CHECKED, IOS_CHECKED, ANDROID_COLUMNS, IOS_COLUMNS],
+            repr((code.co_code, code.co_consts, code.co_names))]
+
+
+def cache_key(path, store, threshold=3, allowed=()):
+    """Return the cache key of a source file cleaned with the given settings."""
+    settings = json.dumps([FORMAT_VERSION, store, threshold, [list(r) for r in allowed],
+                           _rules()])
+    digest = hashlib.sha256(file_hash(path).encode('ascii'))
+    digest.update(settings.encode('utf8'))
+    return digest.hexdigest()[:32]
+
+
+def _entry_prefix(path, store):
+    """Entries of different sources with the same file name must not share a
+    prefix, or writing one would remove the other."""
+    location = hashlib.sha256(os.path.abspath(path).encode('utf8')).hexdigest()[:12]
+    return '%s-%s-%s-' % (store, os.path.basename(path), location)
+
+
+def _write_column(directory, name, kind, column):
+    base = os.path.join(directory, name)
+    if kind == 'text':
+        offsets = array('q', [0])
+        with open(base + '.text', 'wb') as text_file:
+            for value in column:
+                encoded = value.encode('utf8')
+                text_file.write(encoded)
+                offsets.append(offsets[-1] + len(encoded))
+        with open(base + '.offsets', 'wb') as offsets_file:
+            offsets.tofile(offsets_file)
+        return {'kind': kind}
+
+    if kind == 'label':
+        codes_by_label = {}
+        codes = array('l', [codes_by_label.setdefault(value, len(codes_by_label))
+                            for value in column])
+        with open(base + '.codes', 'wb') as codes_file:
+            codes.tofile(codes_file)
+        return {'kind': kind, 'labels': list(codes_by_label)}
+
+    with open(base + '.values', 'wb') as values_file:
+        column.tofile(values_file)
+    return {'kind': kind, 'typecode': column.typecode}
+
+
+def write_entry(directory, table, schema):
+    """Write a columnar table to ``directory``."""
+    os.makedirs(directory)
+    meta = {'n_rows': 0, 'columns': {}}
+    for name, column in table.items():
+        meta['n_rows'] = len(column)
+        meta['columns'][name] = _write_column(directory, name, schema.get(name, 'text'), column)
+
+    with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf8') as meta_file:
+        json.dump(meta, meta_file)
+
+
+def _map(path, typecode='B'):
+    """Memory-map a file read-only as a memoryview of ``typecode`` items."""
+    with open(path, 'rb') as opened_file:
+        if os.fstat(opened_file.fileno()).st_size == 0:
+            return memoryview(b'').cast(typecode)
+        mapped = mmap.mmap(opened_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    return memoryview(mapped).cast(typecode)
+
+
+class LabelColumn:
+    """Read-only column of labels stored as integer codes."""
+
+    def __init__(self, codes, labels):
+        self.codes = codes
+        self.labels = labels
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, position):
+        return self.labels[self.codes[position]]
+
+    def __iter__(self):
+        return map(self.labels.__getitem__, self.codes)
+
+
+class TextColumn:
+    """Read-only column of strings, decoded from the mapped file on access."""
+
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += len(self)
+        start = self.offsets[position]
+        return str(self.text[start:self.offsets[position + 1]], 'utf8')
+
+    def __iter__(self):
+        text = self.text
+        start = 0
+        for end in self.offsets[1:]:
+            yield str(text[start:end], 'utf8')
+            start = end
+
+
+def read_entry(directory):
+    """Map the columns of a cache entry written by ``write_entry``."""
+    with open(os.path.join(directory, 'meta.json'), encoding='utf8') as meta_file:
+        meta = json.load(meta_file)
+
+    table = {}
+    for name, column_meta in meta['columns'].items():
+        base = os.path.join(directory, name)
+        kind = column_meta['kind']
+        if kind == 'text':
+            table[name] = TextColumn(_map(base + '.text'), _map(base + '.offsets', 'q'))
+        elif kind == 'label':
+            table[name] = LabelColumn(_map(base + '.codes', 'l'), column_meta['labels'])
+        else:
+            table[name] = _map(base + '.values', column_meta['typecode'])
+
+    return table
+
+
+def cached_columns(path, store, threshold=3, allowed=(), cache_dir=CACHE_DIR):
+    """Return the cleaned columns of the ``store`` data set at ``path``.
+
+    ``store`` is 'android' or 'ios'. The columns are read from the cache if
+    an entry for the current content of ``path`` and these settings exists,
+    otherwise the data set is cleaned, parsed and cached first.
+    """
+    pipeline, schema, columns = STORES[store]
+    prefix = _entry_prefix(path, store)
+    directory = os.path.join(cache_dir, prefix + cache_key(path, store, threshold, allowed))
+
+    if not os.path.exists(os.path.join(directory, 'meta.json')):
+        rows = pipeline(path, threshold=threshold, allowed=allowed)
+        table = columnar(rows, read_header(path), schema, columns)
+
+        temporary = directory + '.tmp-%d' % os.getpid()
+        shutil.rmtree(temporary, ignore_errors=True)
+        write_entry(temporary, table, schema)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(temporary, directory)
+        clear_cache(cache_dir, prefix, keep=directory)
+
+    return read_entry(directory)
+
+
+def clear_cache(cache_dir=CACHE_DIR, prefix='', keep=None):
+    """Remove the cache entries whose name starts with ``prefix``, except ``keep``."""
+    if not os.path.isdir(cache_dir):
+        return
+
+    for entry in os.listdir(cache_dir):
+        directory = os.path.join(cache_dir, entry)
+        if entry.startswith(prefix) and directory != keep:
+            shutil.rmtree(directory, ignore_errors=True)
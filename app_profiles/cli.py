@@ -0,0 +1,179 @@
+"""Command line interface, run as ``python -m app_profiles``.
+
+    python -m app_profiles --android googleplaystore.csv --ios AppleStore.csv
+    python -m app_profiles --android export.csv --stages clean averages --cache
+    python -m app_profiles --android export.csv --stages clean --export clean.csv
+
+Runs the selected stages on the given files and prints their results:
+
++ clean: clean the data sets and print how many apps are left,
++ explore: print the first rows of the cleaned data sets,
++ freq: print the frequency tables of the genre and category columns,
++ averages: print the average installs / user ratings per category / genre,
++ profiles: print both markets side by side per category (needs both files).
+
+``--limit`` shortens the printed tables; ``--export`` writes the cleaned data
+sets to files instead (CSV, JSON, JSON lines or Parquet, by extension).
+"""
+
+import argparse
+import os
+import sys
+
+from app_profiles.aggregate import group_by
+from app_profiles.columns import (
+    ANDROID_COLUMNS,
+    ANDROID_SCHEMA,
+    IOS_COLUMNS,
+    IOS_SCHEMA,
+    columnar,
+    n_rows,
+    row_at,
+)
+from app_profiles.explore import explore_data
+from app_profiles.pipeline import android_pipeline, ios_pipeline, read_header
+from app_profiles.report import export_table, write_lines
+from app_profiles.stages import StageProfiler
+from app_profiles.tables import display_column
+from app_profiles.validate import reject_writer
+
+STAGES = ['clean', 'explore', 'freq', 'averages', 'profiles']
+
+STORES = {
+    'android': {
+        'pipeline': android_pipeline,
+        'schema': ANDROID_SCHEMA,
+        'columns': ANDROID_COLUMNS,
+        'freq': ['Category', 'Genres'],
+        'averages': ('Category', 'Installs'),
+    },
+    'ios': {
+        'pipeline': ios_pipeline,
+        'schema': IOS_SCHEMA,
+        'columns': IOS_COLUMNS,
+        'freq': ['prime_genre'],
+        'averages': ('prime_genre', 'rating_count_tot'),
+    },
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m app_profiles',
+                                     description='Profitable app profiles analysis.')
+    parser.add_argument('--android', metavar='PATH', help='Google Play CSV export')
+    parser.add_argument('--ios', metavar='PATH', help='App Store CSV export')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES,
+                        help='stages to run (default: all)')
+    parser.add_argument('--cache', action='store_true',
+                        help='read and write cleaned data sets from the on-disk cache')
+    parser.add_argument('--cache-dir', default=None, help='cache directory')
+    parser.add_argument('--rejects', metavar='PATH',
+                        help='write invalid rows to PATH (one file per store, prefixed)')
+    parser.add_argument('--limit', type=int, metavar='N',
+                        help='print at most N lines of every table')
+    parser.add_argument('--export', metavar='PATH',
+                        help='write the cleaned data sets to PATH (store name inserted '
+                             'before the extension, e.g. clean.android.csv)')
+    parser.add_argument('--profile-json', metavar='PATH',
+                        help='write per-stage measurements to PATH as JSON')
+    parser.add_argument('--profile', action='store_true',
+                        help='also run cProfile for every stage (with --profile-json)')
+    args = parser.parse_args(argv)
+    if not args.android and not args.ios:
+        parser.error('give at least one of --android and --ios')
+    if args.profile and not args.profile_json:
+        parser.error('--profile needs --profile-json')
+    if args.rejects and args.cache:
+        parser.error('--rejects cannot be used with --cache (cached data sets have no rejects)')
+    return args
+
+
+def load(store, path, args, profiler):
+    """Return the cleaned columns of one data set."""
+    config = STORES[store]
+    if args.cache:
+        from app_profiles.cache import CACHE_DIR, cached_columns
+        return profiler.call('load', cached_columns, path, store,
+                             cache_dir=args.cache_dir or CACHE_DIR)
+
+    header = read_header(path)
+    reject = None
+    rejects_file = None
+    if args.rejects:
+        rejects_file = open('%s.%s' % (args.rejects, store), 'w', encoding='utf8', newline='')
+        reject = reject_writer(rejects_file, header)
+
+    try:
+        rows = list(config['pipeline'](path, reject=reject, profiler=profiler))
+    finally:
+        if rejects_file is not None:
+            rejects_file.close()
+
+    return profiler.call('columnar', columnar, rows, header, config['schema'],
+                         config['columns'])
+
+
+def export(table, path, store):
+    """Write a cleaned table to ``path`` with ``store`` inserted before the extension."""
+    root, extension = os.path.splitext(path)
+    export_table('%s.%s%s' % (root, store, extension), table)
+
+
+def run(args):
+    profiler = StageProfiler(memory=bool(args.profile_json), profile=args.profile)
+    with profiler:
+        tables = {}
+        for store in ('android', 'ios'):
+            path = getattr(args, store)
+            if path:
+                profiler.prefix = store + ':'
+                tables[store] = load(store, path, args, profiler)
+
+        for store, table in tables.items():
+            config = STORES[store]
+            profiler.prefix = store + ':'
+            print('### %s ###' % store)
+            if 'clean' in args.stages:
+                print('Number of apps:', n_rows(table))
+            if 'explore' in args.stages:
+                rows = [list(row_at(table, position).values())
+                        for position in range(min(3, n_rows(table)))]
+                print(list(table))
+                print('\n')
+                explore_data(rows, 0, 3)
+            if 'freq' in args.stages:
+                for name in config['freq']:
+                    print('--- %s ---' % name)
+                    profiler.call('freq', display_column, table[name], limit=args.limit)
+            if 'averages' in args.stages:
+                group, value = config['averages']
+                print('--- average %s per %s ---' % (value, group))
+                stats = profiler.call('averages', group_by, table[group], table[value])
+                write_lines(('%s : %s' % (key, stats[key]['mean']) for key in stats),
+                            limit=args.limit)
+            if args.export:
+                profiler.call('export', export, table, args.export, store)
+
+        if 'profiles' in args.stages:
+            print('### profiles ###')
+            if len(tables) < 2:
+                print('skipped: needs both --android and --ios')
+            else:
+                from app_profiles.matching import market_profiles
+                profiler.prefix = ''
+                profiles = profiler.call('profiles', market_profiles, tables['android'],
+                                         tables['ios'])
+                write_lines(('%s : %s' % (category, metrics)
+                             for category, metrics in profiles.items()), limit=args.limit)
+
+    if args.profile_json:
+        profiler.write_json(args.profile_json)
+
+
+def main(argv=None):
+    run(parse_args(argv))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""Typed, column-oriented storage for cleaned data sets.
+
+Each data set is parsed once into a dict mapping column names (taken from
+``android_header`` / ``ios_header``) to columns:
+
++ numeric columns are ``array.array`` objects, 8 bytes per value instead of a
+  string object each (``numpy.frombuffer`` can wrap them without copying),
++ low-cardinality text such as categories and genres is interned, so every
+  row of the same genre points at a single string,
++ free text such as app names is kept as a plain list.
+
+Analyses then read e.g. ``columns['Installs'][i]`` as an integer instead of
+re-parsing ``app[5]`` in every loop. Parsing costs time per column, so only
+the columns in ``ANDROID_COLUMNS`` / ``IOS_COLUMNS`` are usually kept.
+"""
+
+import sys
+from array import array
+
+from app_profiles.installs import parse_installs
+
+ANDROID_SCHEMA = {
+    'App': 'text',
+    'Category': 'label',
+    'Rating': 'float',
+    'Reviews': 'int',
+    'Size': 'label',
+    'Installs': 'installs',
+    'Type': 'label',
+    'Price': 'price',
+    'Content Rating': 'label',
+    'Genres': 'label',
+    'Last Updated': 'label',
+    'Current Ver': 'label',
+    'Android Ver': 'label',
+}
+
+IOS_SCHEMA = {
+    'id': 'text',
+    'track_name': 'text',
+    'size_bytes': 'int',
+    'currency': 'label',
+    'price': 'float',
+    'rating_count_tot': 'int',
+    'rating_count_ver': 'int',
+    'user_rating': 'float',
+    'user_rating_ver': 'float',
+    'ver': 'label',
+    'cont_rating': 'label',
+    'prime_genre': 'label',
+    'sup_devices.num': 'int',
+    'ipadSc_urls.num': 'int',
+    'lang.num': 'int',
+    'vpp_lic': 'int',
+}
+
+# The columns the analysis reads: the cache, the command line and the
+# notebook only parse and keep these, and the pipelines only validate them.
+ANDROID_COLUMNS = ['App', 'Category', 'Rating', 'Reviews', 'Installs', 'Price', 'Genres']
+IOS_COLUMNS = ['id', 'track_name', 'price', 'rating_count_tot', 'user_rating', 'prime_genre']
+
+
+def parse_price(value):
+    """'$4.99' -> 4.99, '0' -> 0.0"""
+    return float(value.replace('$', ''))
+
+
+# kind -> (function that makes an empty column, function that parses a value)
+COLUMN_KINDS = {
+    'text': (list, str),
+    'label': (list, sys.intern),
+    'int': (lambda: array('q'), int),
+    'float': (lambda: array('d'), float),
+    'installs': (lambda: array('q'), parse_installs),
+    'price': (lambda: array('d'), parse_price),
+}
+
+
+def columnar(rows, header, schema, columns=None):
+    """Parse ``rows`` into a dict of typed columns.
+
+    ``schema`` maps column names to kinds (see ``COLUMN_KINDS``); columns that
+    are not in the schema are kept as text. ``columns`` optionally restricts
+    the result to the given column names.
+    """
+    if columns is None:
+        columns = header
+
+    targets = []
+    table = {}
+    for name in columns:
+        make_column, parse = COLUMN_KINDS[schema.get(name, 'text')]
+        column = make_column()
+        table[name] = column
+        targets.append((header.index(name), column.append, parse))
+
+    for row in rows:
+        for index, append, parse in targets:
+            append(parse(row[index]))
+
+    return table
+
+
+def n_rows(table):
+    """Return the number of rows in a columnar table."""
+    for column in table.values():
+        return len(column)
+    return 0
+
+
+def row_at(table, position):
+    """Return row ``position`` of a columnar table as a dict."""
+    return {name: column[position] for name, column in table.items()}
@@ -0,0 +1,88 @@
+"""Duplicate removal for store data sets.
+
+A data set may list the same app several times, one row per crawl. We keep
+exactly one row per app: the one that scores highest under a policy (by
+default the number of reviews, since the most reviewed row is the most
+recent one). Ties keep the earliest row, and the cleaned data set keeps the
+original row order. Every dedup in the package (exact, streamed, sharded,
+incremental and fuzzy) applies this policy through ``update_winner``.
+"""
+
+
+def by_reviews(row):
+    """Default policy: the Google Play 'Reviews' column."""
+    return float(row[3])
+
+
+def update_winner(winners, key, value, position, payload):
+    """Offer ``[value, position, payload]`` as the winner of ``key``.
+
+    It replaces the current winner only if ``value`` is higher, so when
+    entries are offered in position order ties keep the earliest. Returns
+    the previous winner of ``key``, None if there was none; it was replaced
+    if ``winners[key]`` is no longer that list.
+    """
+    best = winners.get(key)
+    if best is None or value > best[0]:
+        winners[key] = [value, position, payload]
+    return best
+
+
+def dedup_winners(dataset, name_index=0, score=by_reviews, n_examples=15, payload=None):
+    """Find the winning row for every app in a single pass.
+
+    Returns ``(winners, report)`` where ``winners`` maps each app name to
+    ``[score, position, row]`` and ``report`` holds the number of duplicate
+    rows and the first ``n_examples`` duplicate names, in the order they were
+    met. With ``payload``, ``payload(row)`` is kept instead of the row (e.g.
+    ``lambda row: None`` to keep only scores and positions).
+    """
+    winners = {}
+    duplicates = 0
+    examples = []
+
+    for position, row in enumerate(dataset):
+        name = row[name_index]
+        if update_winner(winners, name, score(row), position,
+                         row if payload is None else payload(row)) is not None:
+            duplicates += 1
+            if len(examples) < n_examples:
+                examples.append(name)
+
+    report = {'duplicates': duplicates, 'examples': examples}
+    return winners, report
+
+
+def merge_winners(winners, other):
+    """Merge the ``other`` winners into ``winners`` in place.
+
+    Both must come from ``dedup_winners`` (or share its ``[score, position,
+    row]`` layout) with comparable positions. The merged winner of an app is
+    the higher scoring row, or the earlier one on a tie, so merging the
+    winners of consecutive parts of a data set gives the winners of the whole.
+    """
+    for name, best in other.items():
+        current = winners.get(name)
+        if (current is None or best[0] > current[0]
+                or (best[0] == current[0] and best[1] < current[1])):
+            winners[name] = best
+
+    return winners
+
+
+def winning_rows(winners):
+    """Return the winning rows in the order they appear in the data set."""
+    ordered = sorted(winners.values(), key=lambda best: best[1])
+    return [best[2] for best in ordered]
+
+
+def dedup(dataset, name_index=0, score=by_reviews, n_examples=15):
+    """Remove duplicate apps, keeping the highest scoring row of each.
+
+    ``score`` is any function of a row; pass e.g. a crawl timestamp parser to
+    keep the most recent row instead of the most reviewed one.
+
+    Returns ``(clean, report)``, see ``dedup_winners`` for the report.
+    """
+    winners, report = dedup_winners(dataset, name_index, score, n_examples)
+    return winning_rows(winners), report
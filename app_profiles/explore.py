@@ -0,0 +1,30 @@
+"""Printing parts of a data set for a quick look."""
+
+from app_profiles.report import page_of, write_lines
+
+
+def _paragraphs(rows):
+    for row in rows:
+        yield str(row)
+        yield '\n' # adds a new (empty) line after each row
+
+
+def explore_data(dataset, start, end, rows_and_columns=False, file=None):
+    """Print the rows ``start:end`` of ``dataset``, one per paragraph.
+
+    With ``rows_and_columns`` also print the size of the data set. Output
+    goes to ``file`` (default stdout) in buffered batches.
+    """
+    dataset_slice = dataset[start:end]
+    write_lines(_paragraphs(dataset_slice), file)
+
+    if rows_and_columns:
+        write_lines(['Number of rows: %s' % len(dataset),
+                     'Number of columns: %s' % len(dataset[0])], file)
+
+
+def explore_page(dataset, page, page_size=20, file=None):
+    """Print page ``page`` (from 1) of ``dataset``, followed by 'Page x of y'."""
+    rows, n_pages = page_of(dataset, page, page_size)
+    write_lines(_paragraphs(rows), file)
+    write_lines(['Page %d of %d' % (page, n_pages)], file)
@@ -0,0 +1,134 @@
+"""Near-duplicate app names.
+
+``dedup`` only merges rows whose names are identical, but crawls list the
+same app as 'Sudoku Free', 'Sudoku – Free 🎲' or 'sudoku!'. Here names are
+first normalised with ``normalize_name`` (case, accents, symbols, punctuation
+and the ``DEDUP_FILLER_WORDS``), then two distinct normalised names are
+merged when the sets of their character n-grams are at least ``threshold``
+similar (Jaccard) and they contain the same numbers ('FIFA 18' and 'FIFA 19'
+are different apps). Merges are transitive. Names with nothing left after
+normalising (emoji-only names such as '😜') are only merged with the very
+same name.
+
+Comparing all pairs of names is O(n²). Instead every name is indexed under
+the rarest few of its n-grams only (prefix filtering): sorting every gram
+set by how many names use the gram, two sets that are ``threshold`` similar
+always share one of their first ``size - ceil(threshold * size) + 1``
+grams. So no similar pair is missed, and as the rare grams are shared by
+few names, each name is compared with a handful of candidates.
+"""
+
+import math
+import re
+
+from app_profiles.dedup import by_reviews, update_winner, winning_rows
+from app_profiles.matching import normalize_name
+
+_NUMBER = re.compile(r'\d+')
+
+# Only words that mark a variant of the same app. 'Lite' or 'HD' usually name
+# a separate app ('Facebook' and 'Facebook Lite'), unlike in ``match_apps``.
+DEDUP_FILLER_WORDS = frozenset(['free'])
+
+
+def name_grams(name, n=3):
+    """Return the set of character n-grams of a (normalised) name."""
+    padded = ' %s ' % name
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+def _similarity(grams, other):
+    common = len(grams & other)
+    return common / (len(grams) + len(other) - common)
+
+
+def _find(parents, node):
+    while parents[node] != node:
+        parents[node] = parents[parents[node]]
+        node = parents[node]
+    return node
+
+
+def near_duplicate_labels(names, threshold=0.8, n=3):
+    """Group near-duplicate names.
+
+    Returns a list with, for each name, the position of the first name of
+    its group; names with no near duplicate are labelled with their own
+    position.
+    """
+    # Distinct normalised names, numbered in order of first appearance. Names
+    # that normalise to '' keep their own name as a key, with no grams.
+    keys = {}
+    name_keys = {}
+    node_of = []
+    for name in names:
+        key = name_keys.get(name)
+        if key is None:
+            key = name_keys[name] = normalize_name(name, DEDUP_FILLER_WORDS) or (name,)
+        node_of.append(keys.setdefault(key, len(keys)))
+
+    grams = [name_grams(key, n) if isinstance(key, str) else set() for key in keys]
+    sizes = [len(gram_set) for gram_set in grams]
+    numbers = [tuple(_NUMBER.findall(key)) if isinstance(key, str) else () for key in keys]
+    frequency = {}
+    for gram_set in grams:
+        for gram in gram_set:
+            frequency[gram] = frequency.get(gram, 0) + 1
+
+    parents = list(range(len(keys)))
+    index = {}
+    for node, gram_set in enumerate(grams):
+        size = sizes[node]
+        if not size:
+            continue
+        low = threshold * size
+        high = size / threshold
+        prefix = sorted(gram_set, key=lambda gram: (frequency[gram], gram))
+        prefix = prefix[:size - math.ceil(low - 1e-9) + 1]
+
+        # Names with different numbers are never merged, so they needn't
+        # share an index entry either.
+        candidates = set()
+        for gram in prefix:
+            block = (numbers[node], gram)
+            candidates.update(index.get(block, ()))
+            index.setdefault(block, []).append(node)
+
+        for other in candidates:
+            if (low <= sizes[other] <= high
+                    and _similarity(gram_set, grams[other]) >= threshold):
+                parents[_find(parents, node)] = _find(parents, other)
+
+    first = {}
+    labels = []
+    for position, node in enumerate(node_of):
+        labels.append(first.setdefault(_find(parents, node), position))
+    return labels
+
+
+def fuzzy_dedup(dataset, name_index=0, score=by_reviews, threshold=0.8, n=3,
+                n_examples=15):
+    """Remove near-duplicate apps, keeping the highest scoring row of each.
+
+    Like ``dedup`` (ties keep the earliest row, the original row order is
+    kept), but rows are grouped with ``near_duplicate_labels``. Returns
+    ``(clean, report)``; the report holds the number of rows removed and up
+    to ``n_examples`` groups whose names differ, as lists of those names.
+    """
+    labels = near_duplicate_labels([row[name_index] for row in dataset], threshold, n)
+
+    winners = {}
+    variants = {}
+    duplicates = 0
+    for position, (label, row) in enumerate(zip(labels, dataset)):
+        if update_winner(winners, label, score(row), position, row) is None:
+            variants[label] = [row[name_index]]
+            continue
+
+        duplicates += 1
+        if row[name_index] not in variants[label]:
+            variants[label].append(row[name_index])
+
+    examples = [names for names in variants.values() if len(names) > 1][:n_examples]
+    report = {'duplicates': duplicates, 'examples': examples}
+    return winning_rows(winners), report
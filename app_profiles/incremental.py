@@ -0,0 +1,251 @@
+"""Incremental ingestion of daily store snapshots.
+
+Instead of cleaning and aggregating the whole history every day, we keep a
+state that is updated with each new snapshot (a delta):
+
++ the dedup winner of every app (its score and position), as in
+  ``dedup_winners``, plus whether the winner passes the English and free
+  filters, and the row of the winners that do,
++ value counts of the frequency-table columns of the kept winners,
++ per-group counts and sums for the group averages.
+
+Applying a delta only looks at the delta's rows: when a row beats the
+current winner of its app, the old winner's contribution is subtracted from
+the aggregates and the new one's added.
+
+The winners are kept in an SQLite database keyed by app name, so a delta
+only reads and writes the winners of the apps it lists. The aggregates are
+small and are pickled into the same database; ``save_state`` commits both
+in one transaction.
+"""
+
+import json
+import os
+import pickle
+import sqlite3
+
+from app_profiles.columns import ANDROID_SCHEMA, COLUMN_KINDS, IOS_SCHEMA
+from app_profiles.dedup import by_reviews, update_winner
+from app_profiles.language import english_classifier
+from app_profiles.pipeline import (
+    ANDROID_FREE,
+    ANDROID_NAME,
+    ANDROID_PRICE,
+    IOS_FREE,
+    IOS_NAME,
+    IOS_PRICE,
+    read_header,
+    read_rows,
+)
+from app_profiles.tables import percentages
+from app_profiles.validate import ANDROID_CHECKED, IOS_CHECKED, validated
+
+
+def by_rating_count(row):
+    """Policy for App Store snapshots: the 'rating_count_tot' column."""
+    return float(row[5])
+
+
+def android_keep(row):
+    return english_classifier()(row[ANDROID_NAME]) and row[ANDROID_PRICE] == ANDROID_FREE
+
+
+def ios_keep(row):
+    return english_classifier()(row[IOS_NAME]) and row[IOS_PRICE] == IOS_FREE
+
+
+# App Store snapshots repeat every app, so they are deduplicated by 'id'.
+STORES = {
+    'android': {
+        'schema': ANDROID_SCHEMA,
+        'checked': ANDROID_CHECKED,
+        'name': ANDROID_NAME,
+        'score': by_reviews,
+        'keep': android_keep,
+        'counts': ['Category', 'Genres', 'Installs'],
+        'sums': [('Category', 'Installs'), ('Genres', 'Installs')],
+    },
+    'ios': {
+        'schema': IOS_SCHEMA,
+        'checked': IOS_CHECKED,
+        'name': 0,
+        'score': by_rating_count,
+        'keep': ios_keep,
+        'counts': ['prime_genre'],
+        'sums': [('prime_genre', 'rating_count_tot')],
+    },
+}
+
+
+def _connect(path):
+    connection = sqlite3.connect(path)
+    connection.execute('CREATE TABLE IF NOT EXISTS winners (name TEXT PRIMARY KEY, '
+                       'score REAL, position INTEGER, kept INTEGER, row TEXT)')
+    connection.execute('CREATE TABLE IF NOT EXISTS summary (id INTEGER PRIMARY KEY, data BLOB)')
+    return connection
+
+
+def new_state(store, header, path=':memory:'):
+    """Return an empty state for the ``store`` ('android' or 'ios') data set.
+
+    Its winners are kept in the database at ``path``, in memory by default.
+    """
+    config = STORES[store]
+    return {
+        'store': store,
+        'header': list(header),
+        'rows_seen': 0,
+        'duplicates': 0,
+        'n_kept': 0,
+        'counts': {column: {} for column in config['counts']},
+        'sums': {pair: {} for pair in config['sums']},
+        'connection': _connect(path),
+    }
+
+
+def _parser(schema, header, column):
+    return header.index(column), COLUMN_KINDS[schema.get(column, 'text')][1]
+
+
+def _contribute(state, row, sign, parsers):
+    """Add (``sign`` = 1) or remove (``sign`` = -1) a kept row from the aggregates."""
+    state['n_kept'] += sign
+    for column, (index, parse) in parsers['counts'].items():
+        counts = state['counts'][column]
+        value = parse(row[index])
+        counts[value] = counts.get(value, 0) + sign
+        if counts[value] == 0:
+            del counts[value]
+
+    for pair, ((group_index, group_parse), (value_index, value_parse)) in parsers['sums'].items():
+        groups = state['sums'][pair]
+        group = group_parse(row[group_index])
+        totals = groups.setdefault(group, [0, 0])
+        totals[0] += sign
+        totals[1] += sign * value_parse(row[value_index])
+        if totals[0] == 0:
+            del groups[group]
+
+
+def _stored_winner(connection, name):
+    """Return the stored ``[score, position, row, kept]`` winner of ``name``, or None."""
+    found = connection.execute('SELECT score, position, row, kept FROM winners WHERE name = ?',
+                               (name,)).fetchone()
+    if found is None:
+        return None
+    score, position, row, kept = found
+    return [score, position, row if row is None else json.loads(row), bool(kept)]
+
+
+def apply_delta(state, rows, reject=None):
+    """Update ``state`` with the rows of a new snapshot.
+
+    Rows are validated against the state's header first; invalid rows go to
+    ``reject``, see ``validated``. The changes are saved by ``save_state``.
+    """
+    config = STORES[state['store']]
+    schema = config['schema']
+    header = state['header']
+    name_index = config['name']
+    score = config['score']
+    keep = config['keep']
+    connection = state['connection']
+    parsers = {
+        'counts': {column: _parser(schema, header, column) for column in config['counts']},
+        'sums': {(group, value): (_parser(schema, header, group), _parser(schema, header, value))
+                 for group, value in config['sums']},
+    }
+
+    # The winners of the apps in this delta, read from the database on first use.
+    winners = {}
+    changed = set()
+    for row in validated(rows, header, schema, reject, config['checked']):
+        position = state['rows_seen']
+        state['rows_seen'] += 1
+        name = row[name_index]
+        if name not in winners:
+            stored = _stored_winner(connection, name)
+            if stored is not None:
+                winners[name] = stored
+
+        previous = update_winner(winners, name, score(row), position, row)
+        if previous is not None:
+            state['duplicates'] += 1
+            if winners[name] is previous:
+                continue
+            if previous[3]:
+                _contribute(state, previous[2], -1, parsers)
+
+        kept = keep(row)
+        winners[name].append(kept)
+        changed.add(name)
+        if kept:
+            _contribute(state, row, 1, parsers)
+
+    records = []
+    for name in changed:
+        value, position, row, kept = winners[name]
+        records.append((name, value, position, kept, json.dumps(row) if kept else None))
+    connection.executemany('INSERT OR REPLACE INTO winners VALUES (?, ?, ?, ?, ?)', records)
+    return state
+
+
+def apply_file(state, path, reject=None):
+    """Update ``state`` with the snapshot CSV file at ``path``."""
+    if read_header(path) != state['header']:
+        raise ValueError('%s does not have the header of the state' % path)
+
+    return apply_delta(state, read_rows(path), reject)
+
+
+def load_state(path, store, header):
+    """Open the state saved at ``path``, or start a new one there if there is none.
+
+    Raises ValueError if the saved state is of another store or header.
+    """
+    if not os.path.exists(path):
+        return new_state(store, header, path)
+
+    connection = _connect(path)
+    found = connection.execute('SELECT data FROM summary WHERE id = 0').fetchone()
+    if found is None:
+        connection.close()
+        return new_state(store, header, path)
+
+    state = pickle.loads(found[0])
+    if state['store'] != store or state['header'] != list(header):
+        connection.close()
+        raise ValueError('%s holds the state of another data set (%s)' % (path, state['store']))
+    state['connection'] = connection
+    return state
+
+
+def save_state(state):
+    """Commit the winners and aggregates of ``state`` to its database at once."""
+    summary = {key: value for key, value in state.items() if key != 'connection'}
+    connection = state['connection']
+    connection.execute('INSERT OR REPLACE INTO summary VALUES (0, ?)',
+                       (pickle.dumps(summary, pickle.HIGHEST_PROTOCOL),))
+    connection.commit()
+
+
+def close_state(state):
+    """Close the database of ``state``; unsaved changes are discarded."""
+    state['connection'].close()
+
+
+def state_rows(state):
+    """Return the kept winning rows in the order of their positions, as
+    ``android_pipeline`` / ``ios_pipeline`` would over the whole history."""
+    return [json.loads(row) for row, in state['connection'].execute(
+        'SELECT row FROM winners WHERE kept ORDER BY position')]
+
+
+def state_freq_table(state, column):
+    """Return the ``freq_table`` percentages of ``column`` over the kept rows."""
+    return percentages(state['counts'][column], state['n_kept'])
+
+
+def state_means(state, group, value):
+    """Return the mean of ``value`` for every ``group`` over the kept rows."""
+    return {key: total / count for key, (count, total) in state['sums'][(group, value)].items()}
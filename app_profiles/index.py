@@ -0,0 +1,57 @@
+"""Secondary indexes for drill-down queries on columnar data sets.
+
+Build them once after cleaning, then answer queries like "COMMUNICATION
+apps with at least 100 million installs" by a dict lookup and a binary
+search instead of a scan of the whole data set:
+
+    by_category = group_ordered_index(columns['Category'], columns['Installs'])
+    row_ids = range_ids(by_category['COMMUNICATION'], low=100000000)
+
+Row ids are positions in the columns (and in the rows they were built from).
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+def group_index(groups):
+    """Map every value of the ``groups`` column to the ids of its rows."""
+    index = {}
+    for row_id, group in enumerate(groups):
+        ids = index.get(group)
+        if ids is None:
+            ids = index[group] = array('l')
+        ids.append(row_id)
+
+    return index
+
+
+def ordered_index(values, ids=None):
+    """Return ``(keys, ids)``: the given row ids sorted by ``values``.
+
+    ``ids`` defaults to every row.
+    """
+    if ids is None:
+        ids = range(len(values))
+    ordered = array('l', sorted(ids, key=values.__getitem__))
+    keys = [values[row_id] for row_id in ordered]
+    if isinstance(values, array):
+        keys = array(values.typecode, keys)
+
+    return keys, ordered
+
+
+def group_ordered_index(groups, values):
+    """Map every value of ``groups`` to an ``ordered_index`` of ``values`` over its rows."""
+    return {group: ordered_index(values, ids) for group, ids in group_index(groups).items()}
+
+
+def range_ids(index, low=None, high=None):
+    """Return the ids of the rows with ``low <= value < high``, in row order.
+
+    ``index`` is an ``ordered_index``; a missing bound is open.
+    """
+    keys, ids = index
+    start = 0 if low is None else bisect_left(keys, low)
+    end = len(keys) if high is None else bisect_left(keys, high)
+    return sorted(ids[start:end])
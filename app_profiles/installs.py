@@ -0,0 +1,59 @@
+"""The Google Play 'Installs' buckets.
+
+The column only takes about twenty values ('0', '1+', ..., '1,000,000,000+'),
+so instead of stripping commas and plus signs and converting every row, each
+value is looked up in a table built once. A bucket has its label, its lower
+bound (what we use as the number of installs: '100,000+' -> 100000) and its
+ordinal, its position among the buckets, so "at least 100 million installs"
+is an integer comparison either way.
+
+Labels that aren't in the table are parsed the old way once, then cached.
+"""
+
+from bisect import bisect_right
+from collections import namedtuple
+
+InstallBucket = namedtuple('InstallBucket', ['label', 'bound', 'ordinal'])
+
+LABELS = (
+    '0', '0+', '1+', '5+', '10+', '50+', '100+', '500+', '1,000+', '5,000+',
+    '10,000+', '50,000+', '100,000+', '500,000+', '1,000,000+', '5,000,000+',
+    '10,000,000+', '50,000,000+', '100,000,000+', '500,000,000+', '1,000,000,000+',
+)
+
+
+def _bound(label):
+    return int(label.replace(',', '').replace('+', ''))
+
+
+_BOUNDS = sorted(set(_bound(label) for label in LABELS))
+
+BUCKETS = {label: InstallBucket(label, _bound(label), _BOUNDS.index(_bound(label)))
+           for label in LABELS}
+
+INSTALL_BOUNDS = {label: bucket.bound for label, bucket in BUCKETS.items()}
+
+
+def bucket(label):
+    """Return the ``InstallBucket`` of an 'Installs' value."""
+    try:
+        return BUCKETS[label]
+    except KeyError:
+        bound = _bound(label)
+        # Unknown labels rank with the largest standard bound below them.
+        BUCKETS[label] = InstallBucket(label, bound, bisect_right(_BOUNDS, bound) - 1)
+        INSTALL_BOUNDS[label] = bound
+        return BUCKETS[label]
+
+
+def parse_installs(label):
+    """'1,000,000+' -> 1000000, with one dict lookup for known labels."""
+    try:
+        return INSTALL_BOUNDS[label]
+    except KeyError:
+        return bucket(label).bound
+
+
+def install_ordinal(label):
+    """Position of an 'Installs' value among the buckets: '0' -> 0, '1+' -> 1, ..."""
+    return bucket(label).ordinal
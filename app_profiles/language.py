@@ -0,0 +1,72 @@
+"""Detecting app names that are not aimed at an English-speaking audience.
+
+A name is treated as English unless it has more than ``threshold`` (3 by
+default) characters outside the ASCII range. A few are tolerated so that
+names with emojis or symbols like '™' are kept. Characters in the
+``allowed`` ranges, e.g. ``EMOJI`` or ``SYMBOLS``, don't count at all.
+
+Most names are plain ASCII, so they are answered by ``str.isascii`` without
+looking at individual characters. The rest are counted with a single
+``encode`` call, and the result is cached per unique name.
+"""
+
+from functools import lru_cache
+
+# Inclusive (first, last) code point ranges.
+EMOJI = ((0x2600, 0x27BF), (0x1F000, 0x1FAFF))
+SYMBOLS = ((0x00A9, 0x00A9), (0x00AE, 0x00AE), (0x2122, 0x2122))
+
+CACHE_SIZE = 2 ** 20
+
+_classifiers = {}
+
+
+def non_ascii_count(string, allowed=()):
+    """Count the characters of ``string`` outside ASCII and the ``allowed`` ranges."""
+    count = len(string) - len(string.encode('ascii', 'ignore'))
+    if count and allowed:
+        for character in string:
+            code = ord(character)
+            if code > 127 and any(first <= code <= last for first, last in allowed):
+                count -= 1
+
+    return count
+
+
+def is_english(string, threshold=3, allowed=()):
+    """Return False if ``string`` has more than ``threshold`` non-ASCII characters."""
+    if string.isascii():
+        return True
+
+    return non_ascii_count(string, allowed) <= threshold
+
+
+def english_classifier(threshold=3, allowed=()):
+    """Return a cached ``is_english`` for the given settings.
+
+    The same function (and cache) is returned every time it is asked for with
+    the same settings, so names met in earlier batches are not classified
+    again.
+    """
+    key = (threshold, tuple(allowed))
+    if key not in _classifiers:
+        @lru_cache(maxsize=CACHE_SIZE)
+        def classify(string):
+            return non_ascii_count(string, key[1]) <= threshold
+
+        def cached_is_english(string):
+            return string.isascii() or classify(string)
+
+        cached_is_english.cache_info = classify.cache_info
+        _classifiers[key] = cached_is_english
+
+    return _classifiers[key]
+
+
+def english_mask(names, threshold=3, allowed=()):
+    """Classify a whole column of names at once.
+
+    Returns a list of booleans, True where the name is English.
+    """
+    classify = english_classifier(threshold, allowed)
+    return [classify(name) for name in names]
@@ -0,0 +1,173 @@
+"""Matching apps across Google Play and the App Store.
+
+App names are normalised (case, accents, punctuation and filler words such
+as 'free' or 'lite' removed) and App Store genres are mapped onto Google
+Play categories with ``GENRE_TO_CATEGORY``. An App Store app then matches:
+
+1. a Google Play app with the same normalised name, found in a hash index, or
+2. failing that, the Google Play app of the same category and first name
+   word whose name shares the most words with it (at least
+   ``min_similarity`` of them, by Jaccard similarity).
+
+Each Google Play app is matched at most once, so per-category metrics of
+matched apps count every app once; names that normalise to nothing (emoji
+only) are not matched at all. Only apps in the same block are ever compared, so matching is close to
+linear in the size of the two data sets rather than O(n·m).
+"""
+
+import re
+import unicodedata
+
+from app_profiles.aggregate import group_by
+
+FILLER_WORDS = frozenset(['free', 'lite', 'app', 'the', 'hd'])
+
+# App Store 'prime_genre' -> Google Play 'Category'; None where there is no
+# matching category.
+GENRE_TO_CATEGORY = {
+    'Book': 'BOOKS_AND_REFERENCE',
+    'Business': 'BUSINESS',
+    'Catalogs': 'SHOPPING',
+    'Education': 'EDUCATION',
+    'Entertainment': 'ENTERTAINMENT',
+    'Finance': 'FINANCE',
+    'Food & Drink': 'FOOD_AND_DRINK',
+    'Games': 'GAME',
+    'Health & Fitness': 'HEALTH_AND_FITNESS',
+    'Lifestyle': 'LIFESTYLE',
+    'Medical': 'MEDICAL',
+    'Music': None,
+    'Navigation': 'MAPS_AND_NAVIGATION',
+    'News': 'NEWS_AND_MAGAZINES',
+    'Photo & Video': 'PHOTOGRAPHY',
+    'Productivity': 'PRODUCTIVITY',
+    'Reference': 'BOOKS_AND_REFERENCE',
+    'Shopping': 'SHOPPING',
+    'Social Networking': 'SOCIAL',
+    'Sports': 'SPORTS',
+    'Travel': 'TRAVEL_AND_LOCAL',
+    'Utilities': 'TOOLS',
+    'Weather': 'WEATHER',
+}
+
+_WORD = re.compile(r'\w+')
+
+
+def name_tokens(name, filler=FILLER_WORDS):
+    """Return the normalised words of an app name, without the ``filler`` words."""
+    # Drop symbols such as '™' or emojis first, NFKD would turn '™' into 'TM'.
+    name = ''.join(c for c in name if not unicodedata.category(c).startswith('S'))
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    words = _WORD.findall(stripped.casefold())
+    tokens = [word for word in words if word not in filler]
+    return tokens or words
+
+
+def normalize_name(name, filler=FILLER_WORDS):
+    """Return the normalised form of an app name, e.g. 'Docs To Go™ Free' -> 'docs to go'."""
+    return ' '.join(name_tokens(name, filler))
+
+
+def _similarity(tokens, other):
+    tokens = set(tokens)
+    other = set(other)
+    return len(tokens & other) / len(tokens | other)
+
+
+def match_apps(android_names, android_categories, ios_names, ios_genres,
+               min_similarity=0.6):
+    """Match App Store apps to Google Play apps.
+
+    Takes the name and category/genre columns of both data sets and returns
+    ``(android_id, ios_id, similarity)`` triples, one per matched App Store
+    app and in App Store order, where ids are row positions and
+    ``similarity`` is 1.0 for exact name matches. Matches are one-to-one:
+    a Google Play app is matched to at most one App Store app, exact
+    matches first. Names with nothing left after normalising (e.g. emoji
+    only) are never matched.
+    """
+    by_name = {}
+    by_block = {}
+    for android_id, (name, category) in enumerate(zip(android_names, android_categories)):
+        tokens = name_tokens(name)
+        if tokens:
+            by_name.setdefault(' '.join(tokens), []).append((android_id, category))
+            by_block.setdefault((category, tokens[0]), []).append((android_id, tokens))
+
+    used = set()
+    matches = []
+    unmatched = []
+    for ios_id, (name, genre) in enumerate(zip(ios_names, ios_genres)):
+        tokens = name_tokens(name)
+        if not tokens:
+            continue
+        category = GENRE_TO_CATEGORY.get(genre)
+        # Prefer a candidate in the matching category.
+        candidates = [candidate for candidate in by_name.get(' '.join(tokens), ())
+                      if candidate[0] not in used]
+        if candidates:
+            android_id = candidates[0][0]
+            for candidate_id, candidate_category in candidates:
+                if candidate_category == category:
+                    android_id = candidate_id
+                    break
+            used.add(android_id)
+            matches.append((android_id, ios_id, 1.0))
+        elif category is not None:
+            unmatched.append((ios_id, tokens, category))
+
+    for ios_id, tokens, category in unmatched:
+        best_id = None
+        best_similarity = min_similarity
+        for android_id, android_tokens in by_block.get((category, tokens[0]), ()):
+            if android_id in used:
+                continue
+            similarity = _similarity(tokens, android_tokens)
+            if similarity >= best_similarity:
+                best_id = android_id
+                best_similarity = similarity
+        if best_id is not None:
+            used.add(best_id)
+            matches.append((best_id, ios_id, best_similarity))
+
+    matches.sort(key=lambda match: match[1])
+    return matches
+
+
+def matched_profiles(matches, android_columns, ios_columns):
+    """Combine the metrics of matched apps by Google Play category.
+
+    Returns a dict mapping each category to the number of matched apps, their
+    average number of installs on Google Play and their average number of
+    user ratings on the App Store. ``matches`` must be one-to-one, as
+    returned by ``match_apps``, or apps are counted more than once.
+    """
+    categories = [android_columns['Category'][android_id] for android_id, _, _ in matches]
+    installs = [android_columns['Installs'][android_id] for android_id, _, _ in matches]
+    ratings = [ios_columns['rating_count_tot'][ios_id] for _, ios_id, _ in matches]
+
+    android_stats = group_by(categories, installs)
+    ios_stats = group_by(categories, ratings)
+    return {category: {'matches': android_stats[category]['count'],
+                       'android_installs': android_stats[category]['mean'],
+                       'ios_rating_count': ios_stats[category]['mean']}
+            for category in android_stats}
+
+
+def market_profiles(android_columns, ios_columns):
+    """Combine the per-category metrics of both markets over all apps.
+
+    Returns a dict mapping each Google Play category that some App Store genre
+    maps onto to its average installs on Google Play and the average number
+    of user ratings of the App Store genres mapped onto it.
+    """
+    android_stats = group_by(android_columns['Category'], android_columns['Installs'])
+    categories = [GENRE_TO_CATEGORY.get(genre) for genre in ios_columns['prime_genre']]
+    ios_stats = group_by(categories, ios_columns['rating_count_tot'])
+
+    return {category: {'android_apps': android_stats[category]['count'],
+                       'android_installs': android_stats[category]['mean'],
+                       'ios_apps': ios_stats[category]['count'],
+                       'ios_rating_count': ios_stats[category]['mean']}
+            for category in android_stats if category in ios_stats}
@@ -0,0 +1,133 @@
+"""Memoized frequency tables and group aggregates.
+
+Report views keep asking for the same tables of the same cleaned data:
+``display_table`` rebuilds ``freq_table``, and the per-genre averages are
+computed again for every view. ``ResultCache`` remembers recent results,
+keyed by the function, its arguments and the version of every dataset it
+read. The version of a dataset is its identity, its length and a counter
+that ``invalidate`` bumps, so appending or deleting rows gives new results
+without any bookkeeping; rows edited in place need an explicit
+``invalidate(dataset)``.
+
+The least recently used results are dropped once the cache holds more than
+``max_entries`` results or more than about ``max_bytes`` of them. Cached
+results are shared between callers and must not be modified. Each entry
+keeps its datasets alive (so that their ``id`` can't be reused) until it is
+evicted or invalidated.
+"""
+
+import sys
+from collections import OrderedDict, namedtuple
+
+from app_profiles.aggregate import group_by
+from app_profiles.columns import n_rows
+from app_profiles.robust import robust_stats
+from app_profiles.tables import (
+    column_freq_table,
+    freq_table,
+    print_table,
+    sorted_table,
+)
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'evictions', 'entries', 'bytes'])
+
+
+def _length(dataset):
+    if isinstance(dataset, dict):
+        return n_rows(dataset)
+    return len(dataset)
+
+
+def result_size(result):
+    """Estimate the memory held by a result made of dicts, lists and tuples."""
+    size = sys.getsizeof(result)
+    if isinstance(result, dict):
+        for key, value in result.items():
+            size += result_size(key) + result_size(value)
+    elif isinstance(result, (list, tuple)):
+        for value in result:
+            size += result_size(value)
+    return size
+
+
+class ResultCache:
+    """LRU cache of results computed from datasets (lists of rows or columns)."""
+
+    def __init__(self, max_entries=128, max_bytes=64 * 2**20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (datasets, result, size)
+        self.generations = {}
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, dataset):
+        """Return the version of ``dataset`` that results are keyed by."""
+        return (id(dataset), self.generations.get(id(dataset), 0), _length(dataset))
+
+    def call(self, function, datasets, *args, **kwargs):
+        """Return ``function(*datasets, *args, **kwargs)``, computing it only
+        if no current result is cached. Arguments must be hashable."""
+        key = (function, tuple(self.version(dataset) for dataset in datasets),
+               args, tuple(sorted(kwargs.items())))
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][1]
+
+        self.misses += 1
+        result = function(*datasets, *args, **kwargs)
+        size = result_size(result)
+        if size <= self.max_bytes:
+            self.entries[key] = (datasets, result, size)
+            self.bytes += size
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+        return result
+
+    def _drop(self, key):
+        self.bytes -= self.entries.pop(key)[2]
+
+    def invalidate(self, dataset=None):
+        """Forget the results computed from ``dataset``, or all results."""
+        if dataset is None:
+            self.entries.clear()
+            self.bytes = 0
+            return
+
+        self.generations[id(dataset)] = self.generations.get(id(dataset), 0) + 1
+        stale = [key for key, (datasets, _, _) in self.entries.items()
+                 if any(cached is dataset for cached in datasets)]
+        for key in stale:
+            self._drop(key)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self.entries), self.bytes)
+
+    def freq_table(self, dataset, index):
+        return self.call(freq_table, (dataset,), index)
+
+    def sorted_freq_table(self, dataset, index):
+        return self.call(_sorted_freq_table, (dataset,), index)
+
+    def display_table(self, dataset, index, file=None, limit=None):
+        print_table(self.sorted_freq_table(dataset, index), file, limit)
+
+    def column_freq_table(self, column):
+        return self.call(column_freq_table, (column,))
+
+    def display_column(self, column, file=None, limit=None):
+        print_table(self.column_freq_table(column), file, limit)
+
+    def group_by(self, groups, values, quantiles=()):
+        return self.call(group_by, (groups, values), tuple(quantiles))
+
+    def robust_stats(self, groups, values, **kwargs):
+        return self.call(robust_stats, (groups, values), **kwargs)
+
+
+def _sorted_freq_table(dataset, index):
+    return sorted_table(freq_table(dataset, index))
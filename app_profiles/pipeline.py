@@ -0,0 +1,159 @@
+"""Streaming cleaning pipeline for the two store data sets.
+
+Rows are read lazily from the CSV files and pushed through generator stages,
+so no intermediate copy of a data set is ever built, and only the caller
+decides whether to materialise the final result (e.g. with ``list()``).
+
+The Google Play file is read twice, since which row of an app wins is only
+known at the end of the file: the first pass keeps the best score and its
+position for every app (``winner_positions``), not the rows, and the second
+pass streams the winning rows (``winners_only``). Memory then grows with
+the number of app names, not with the size of their rows.
+"""
+
+from csv import reader
+
+from app_profiles.columns import ANDROID_SCHEMA, IOS_SCHEMA
+from app_profiles.dedup import by_reviews, dedup_winners, winning_rows
+from app_profiles.language import english_classifier
+from app_profiles.stages import call, stage
+from app_profiles.validate import ANDROID_CHECKED, IOS_CHECKED, validated
+
+ANDROID_NAME = 0
+ANDROID_PRICE = 7
+ANDROID_FREE = '0'
+
+IOS_NAME = 1
+IOS_PRICE = 4
+IOS_FREE = '0.0'
+
+
+def read_header(path):
+    """Return the header row of a CSV file."""
+    with open(path, encoding='utf8', newline='') as opened_file:
+        return next(reader(opened_file))
+
+
+def read_rows(path):
+    """Yield the data rows of a CSV file, skipping the header.
+
+    The file is closed once the generator is exhausted or closed.
+    """
+    with open(path, encoding='utf8', newline='') as opened_file:
+        read_file = reader(opened_file)
+        next(read_file, None)
+        yield from read_file
+
+
+def well_formed(rows, n_columns):
+    """Drop rows that don't have exactly ``n_columns`` fields.
+
+    This is what goes wrong with row 10,472 of the Google Play data set,
+    which is missing its 'Category' value.
+    """
+    for row in rows:
+        if len(row) == n_columns:
+            yield row
+
+
+def deduplicated(rows, name_index=0, score=by_reviews, report=None):
+    """Yield one row per app, the one with the highest ``score``.
+
+    Nothing is yielded until ``rows`` is exhausted, and the winning row of
+    every app is held until then; for rows that can be read twice use
+    ``winner_positions`` and ``winners_only`` instead. If ``report`` is a
+    dict it is updated with the duplicate count and examples.
+    """
+    winners, dedup_report = dedup_winners(rows, name_index, score)
+    if report is not None:
+        report.update(dedup_report)
+    yield from winning_rows(winners)
+
+
+def _no_payload(row):
+    return None
+
+
+def winner_positions(rows, name_index=0, score=by_reviews, report=None, n_examples=15):
+    """First dedup pass: return the set of positions of the winning rows.
+
+    The winners are those of ``dedup_winners``, but only their scores and
+    positions are kept. ``report`` is updated like in ``deduplicated``.
+    """
+    winners, dedup_report = dedup_winners(rows, name_index, score, n_examples, _no_payload)
+    if report is not None:
+        report.update(dedup_report)
+    return {best[1] for best in winners.values()}
+
+
+def winners_only(rows, positions, skipped=()):
+    """Second dedup pass: yield the rows at ``positions``.
+
+    Rows whose index is in ``skipped`` (the rows rejected during the first
+    pass) are left out before counting positions.
+    """
+    position = 0
+    for index, row in enumerate(rows):
+        if index in skipped:
+            continue
+        if position in positions:
+            yield row
+        position += 1
+
+
+def english_only(rows, name_index, threshold=3, allowed=()):
+    """Yield the rows whose name passes ``is_english``."""
+    classify = english_classifier(threshold, allowed)
+    for row in rows:
+        if classify(row[name_index]):
+            yield row
+
+
+def free_only(rows, price_index, free_value):
+    """Yield the rows whose price is ``free_value``."""
+    for row in rows:
+        if row[price_index] == free_value:
+            yield row
+
+
+def android_pipeline(path, report=None, reject=None, threshold=3, allowed=(),
+                     profiler=None):
+    """Stream the cleaned, English, free Google Play apps from ``path``.
+
+    The first pass over the file (validation and dedup) runs when this is
+    called, the second one as the result is consumed. Invalid rows are
+    dropped and passed to ``reject``, see ``validated``.
+    ``threshold`` and ``allowed`` are passed on to ``is_english``. Pass a
+    ``StageProfiler`` as ``profiler`` to measure every stage.
+    """
+    header = read_header(path)
+    rejected = set()
+
+    def note_reject(index, reason, row):
+        rejected.add(index)
+        if reject is not None:
+            reject(index, reason, row)
+
+    rows = stage(profiler, 'read', read_rows, None, path)
+    rows = stage(profiler, 'validate', validated, rows, header, ANDROID_SCHEMA, note_reject,
+                 ANDROID_CHECKED)
+    positions = call(profiler, 'dedup', winner_positions, rows, ANDROID_NAME, by_reviews, report)
+
+    rows = stage(profiler, 'reread', read_rows, None, path)
+    rows = stage(profiler, 'winners', winners_only, rows, positions, rejected)
+    rows = stage(profiler, 'is_english', english_only, rows, ANDROID_NAME, threshold, allowed)
+    return stage(profiler, 'free', free_only, rows, ANDROID_PRICE, ANDROID_FREE)
+
+
+def ios_pipeline(path, reject=None, threshold=3, allowed=(), profiler=None):
+    """Stream the English, free App Store apps from ``path``.
+
+    Invalid rows are dropped and passed to ``reject``, see ``validated``.
+    ``threshold`` and ``allowed`` are passed on to ``is_english``. Pass a
+    ``StageProfiler`` as ``profiler`` to measure every stage.
+    """
+    header = read_header(path)
+    rows = stage(profiler, 'read', read_rows, None, path)
+    rows = stage(profiler, 'validate', validated, rows, header, IOS_SCHEMA, reject, IOS_CHECKED)
+    rows = stage(profiler, 'is_english', english_only, rows, IOS_NAME, threshold, allowed)
+    return stage(profiler, 'free', free_only, rows, IOS_PRICE, IOS_FREE)
@@ -0,0 +1,194 @@
+"""Lazy queries over columnar data sets.
+
+Filters are recorded, not run, until a result is asked for; all of them are
+then checked together in one pass over the rows, and no intermediate data
+set is built::
+
+    free_english = (Query(android_columns)
+                    .filter(col('Price') == 0)
+                    .filter(col('App').apply(is_english)))
+    free_english.group_by('Category').mean('Installs')
+
+A query can be reused and extended; every result is computed from the
+original columns.
+"""
+
+import operator
+from array import array
+
+from app_profiles.aggregate import group_by
+from app_profiles.columns import columnar, n_rows
+from app_profiles.tables import percentages
+
+
+class Predicate:
+    """A condition on a row, given its id. Combine with ``&``, ``|`` and ``~``."""
+
+    def __init__(self, test):
+        self.test = test
+
+    def __and__(self, other):
+        first, second = self.test, other.test
+        return Predicate(lambda table, row_id: first(table, row_id) and second(table, row_id))
+
+    def __or__(self, other):
+        first, second = self.test, other.test
+        return Predicate(lambda table, row_id: first(table, row_id) or second(table, row_id))
+
+    def __invert__(self):
+        test = self.test
+        return Predicate(lambda table, row_id: not test(table, row_id))
+
+
+class Column:
+    """A column reference; comparing it with a value gives a ``Predicate``."""
+
+    def __init__(self, name):
+        self.name = name
+
+    # __eq__ builds a predicate, which would make columns unhashable.
+    __hash__ = object.__hash__
+
+    def _compare(self, compare, value):
+        name = self.name
+        return Predicate(lambda table, row_id: compare(table[name][row_id], value))
+
+    def __eq__(self, value):
+        return self._compare(operator.eq, value)
+
+    def __ne__(self, value):
+        return self._compare(operator.ne, value)
+
+    def __lt__(self, value):
+        return self._compare(operator.lt, value)
+
+    def __le__(self, value):
+        return self._compare(operator.le, value)
+
+    def __gt__(self, value):
+        return self._compare(operator.gt, value)
+
+    def __ge__(self, value):
+        return self._compare(operator.ge, value)
+
+    def isin(self, values):
+        values = frozenset(values)
+        return self._compare(lambda value, allowed: value in allowed, values)
+
+    def apply(self, function):
+        """Predicate that is true where ``function(value)`` is true."""
+        name = self.name
+        return Predicate(lambda table, row_id: function(table[name][row_id]))
+
+
+def col(name):
+    """Refer to column ``name`` in a filter, e.g. ``col('Price') == 0``."""
+    return Column(name)
+
+
+class Query:
+    """A lazily filtered view of a columnar table (see ``columnar``)."""
+
+    def __init__(self, table, predicates=()):
+        self.table = table
+        self.predicates = tuple(predicates)
+
+    @classmethod
+    def from_rows(cls, rows, header, schema):
+        return cls(columnar(rows, header, schema))
+
+    def filter(self, predicate):
+        """Return a new query that also requires ``predicate``."""
+        return Query(self.table, self.predicates + (predicate,))
+
+    def row_ids(self):
+        """Yield the ids of the matching rows, checking all filters in one pass."""
+        table = self.table
+        tests = [predicate.test for predicate in self.predicates]
+        for row_id in range(n_rows(table)):
+            for test in tests:
+                if not test(table, row_id):
+                    break
+            else:
+                yield row_id
+
+    def values(self, name):
+        """Yield the values of column ``name`` of the matching rows."""
+        column = self.table[name]
+        return (column[row_id] for row_id in self.row_ids())
+
+    def count(self):
+        return sum(1 for row_id in self.row_ids())
+
+    def sum(self, name):
+        return sum(self.values(name))
+
+    def mean(self, name):
+        total = 0
+        count = 0
+        for value in self.values(name):
+            total += value
+            count += 1
+        return total / count
+
+    def freq_table(self, name):
+        """Return the ``freq_table`` percentages of column ``name``."""
+        counts = {}
+        total = 0
+        for value in self.values(name):
+            total += 1
+            counts[value] = counts.get(value, 0) + 1
+
+        return percentages(counts, total)
+
+    def collect(self, names=None):
+        """Materialise the matching rows as a new columnar table.
+
+        Numeric columns stay arrays of the same type, other columns become
+        lists.
+        """
+        names = list(self.table) if names is None else names
+        row_ids = list(self.row_ids())
+        return {name: _take(self.table[name], row_ids) for name in names}
+
+    def group_by(self, name):
+        return GroupedQuery(self, name)
+
+
+def _take(column, row_ids):
+    values = [column[row_id] for row_id in row_ids]
+    if isinstance(column, array):
+        return array(column.typecode, values)
+    if isinstance(column, memoryview):
+        return array(column.format, values)
+    return values
+
+
+class GroupedQuery:
+    """A query whose results are aggregated per value of a group column."""
+
+    def __init__(self, query, name):
+        self.query = query
+        self.name = name
+
+    def aggregate(self, value_name, quantiles=()):
+        """Return ``group_by`` statistics of ``value_name`` for every group, in one pass."""
+        groups = self.query.table[self.name]
+        values = self.query.table[value_name]
+        row_ids = list(self.query.row_ids())
+        return group_by((groups[row_id] for row_id in row_ids),
+                        (values[row_id] for row_id in row_ids), quantiles)
+
+    def mean(self, value_name):
+        return {group: stats['mean'] for group, stats in self.aggregate(value_name).items()}
+
+    def sum(self, value_name):
+        return {group: stats['sum'] for group, stats in self.aggregate(value_name).items()}
+
+    def count(self):
+        counts = {}
+        groups = self.query.table[self.name]
+        for row_id in self.query.row_ids():
+            group = groups[row_id]
+            counts[group] = counts.get(group, 0) + 1
+        return counts
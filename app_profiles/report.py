@@ -0,0 +1,125 @@
+"""Writing reports: buffered console output, pages and bulk file exports.
+
+Printing a large slice with one ``print`` per row spends more time in
+``print`` than the analysis took. ``write_lines`` joins lines into batches of
+about ``BUFFER_SIZE`` characters and writes each batch at once, optionally
+stopping after ``limit`` lines. ``explore_data``, ``print_table`` and the
+other display functions write through it.
+
+For more rows than anyone reads on screen, ``export_rows`` and
+``export_table`` write a list of rows or a table of columns to a CSV, JSON,
+JSON lines or (if ``pyarrow`` is installed) Parquet file in one go.
+"""
+
+import csv
+import json
+import math
+import os
+import sys
+
+BUFFER_SIZE = 1 << 16
+
+FORMATS = ('csv', 'json', 'jsonl', 'parquet')
+
+# One encoder for all records: json.dumps() builds a new one per call when
+# given options.
+_JSON = json.JSONEncoder(ensure_ascii=False, allow_nan=False)
+
+
+def write_lines(lines, file=None, limit=None, buffer_size=BUFFER_SIZE):
+    """Write ``lines`` (strings without their newline) to ``file`` in batches.
+
+    ``file`` defaults to ``sys.stdout``. With ``limit`` at most that many
+    lines are written, followed by a note if some were left out. Returns the
+    number of lines written.
+    """
+    if file is None:
+        file = sys.stdout
+
+    batch = []
+    batch_size = 0
+    written = 0
+    for line in lines:
+        if limit is not None and written == limit:
+            batch.append('... (more lines not shown)')
+            break
+        batch.append(line)
+        batch_size += len(line) + 1
+        written += 1
+        if batch_size >= buffer_size:
+            batch.append('')
+            file.write('\n'.join(batch))
+            batch = []
+            batch_size = 0
+
+    if batch:
+        batch.append('')
+        file.write('\n'.join(batch))
+    return written
+
+
+def page_of(dataset, page, page_size):
+    """Return ``(rows, n_pages)``: the rows of page ``page`` (from 1) of ``dataset``."""
+    n_pages = max(math.ceil(len(dataset) / page_size), 1)
+    start = (page - 1) * page_size
+    return dataset[start:start + page_size], n_pages
+
+
+def _format(path, format):
+    if format is None:
+        format = os.path.splitext(path)[1].lstrip('.').lower()
+    if format not in FORMATS:
+        raise ValueError('unknown report format %r, expected one of %s'
+                         % (format, ', '.join(FORMATS)))
+    return format
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError('writing Parquet files needs pyarrow') from None
+    return pyarrow
+
+
+def _record(header, row):
+    """A JSON record of ``row``; NaN and infinite numbers become null, as
+    bare NaN is not valid JSON."""
+    return dict(zip(header, [None if isinstance(value, float) and not math.isfinite(value)
+                             else value for value in row]))
+
+
+def export_rows(path, rows, header, format=None):
+    """Write a list of rows with column names ``header`` to ``path``.
+
+    The format is taken from the extension of ``path`` unless given:
+    'csv', 'json' (a list of records), 'jsonl' (a record per line) or
+    'parquet'. JSON formats write missing numbers (NaN) as null.
+    """
+    format = _format(path, format)
+    if format == 'parquet':
+        table = {name: [row[i] for row in rows] for i, name in enumerate(header)}
+        return export_table(path, table, format)
+
+    with open(path, 'w', encoding='utf8', newline='') as opened_file:
+        if format == 'csv':
+            writer = csv.writer(opened_file)
+            writer.writerow(header)
+            writer.writerows(rows)
+        elif format == 'json':
+            opened_file.write(_JSON.encode([_record(header, row) for row in rows]))
+        else:
+            write_lines((_JSON.encode(_record(header, row)) for row in rows), opened_file)
+
+
+def export_table(path, table, format=None):
+    """Write a table of columns (see ``columnar``) to ``path``, like ``export_rows``."""
+    format = _format(path, format)
+    if format == 'parquet':
+        pyarrow = _pyarrow()
+        columns = {name: list(column) for name, column in table.items()}
+        pyarrow.parquet.write_table(pyarrow.table(columns), path)
+        return
+
+    export_rows(path, list(zip(*table.values())), list(table), format)
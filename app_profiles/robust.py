@@ -0,0 +1,115 @@
+"""Skew-resistant popularity metrics per genre or category.
+
+A handful of giants (Waze and Google Maps for Navigation, WhatsApp and
+Messenger for COMMUNICATION) can dominate a group's average. ``robust_stats``
+computes, for every group in one pass over the data:
+
++ the median,
++ the trimmed mean, leaving out the lowest and highest ``trim`` fraction,
++ the outlier-excluded mean, leaving out values outside Tukey's fences
+  (``fence`` times the interquartile range beyond the quartiles) and, if
+  ``limit`` is given, values of at least ``limit``,
+
+and ``robust_ranking`` orders the groups by any of them. All the order
+statistics of a group come from one ``numpy.partition`` call (linear time)
+if NumPy is installed, or from sorting the group once otherwise.
+"""
+
+from app_profiles.aggregate import quantile
+from app_profiles.tables import _numpy
+
+# Below this many values sorting is faster than converting to an array.
+PARTITION_MIN = 64
+
+
+def _ranked(values, ranks):
+    """Return the values as a list in which every position in ``ranks`` holds
+    the value of that rank (0-based), and the values between two such
+    positions are the values of the ranks between them, in any order."""
+    numpy = _numpy()
+    if numpy is None or len(values) < PARTITION_MIN:
+        return sorted(values)
+    return numpy.partition(numpy.asarray(values), sorted(set(ranks))).tolist()
+
+
+def _quantile_ranks(n_values, q):
+    lower = int((n_values - 1) * q)
+    return [lower, min(lower + 1, n_values - 1)]
+
+
+def select(values, k):
+    """Return the ``k``-th smallest value (0-based) of ``values``."""
+    return _ranked(values, [k])[k]
+
+
+def rank_sum(values, start, end):
+    """Return the sum of the order statistics ``start`` to ``end - 1`` of ``values``."""
+    if start >= end:
+        return 0
+    return sum(_ranked(values, [start, end - 1])[start:end])
+
+
+def order_quantile(values, q):
+    """The ``q`` quantile, interpolated like ``aggregate.quantile``."""
+    return quantile(_ranked(values, _quantile_ranks(len(values), q)), q)
+
+
+def _check_trim(trim):
+    if not 0 <= trim < 0.5:
+        raise ValueError('trim must be at least 0 and less than 0.5, got %r' % (trim,))
+
+
+def trimmed_mean(values, trim=0.1):
+    """Mean of ``values`` without the lowest and highest ``trim`` fraction."""
+    _check_trim(trim)
+    cut = int(len(values) * trim)
+    return rank_sum(values, cut, len(values) - cut) / (len(values) - 2 * cut)
+
+
+def robust_stats(groups, values, trim=0.1, fence=1.5, limit=None):
+    """Robust statistics of ``values`` for every group of ``groups``.
+
+    Returns a dict mapping each group to a dict with its 'count', 'mean',
+    'median', 'trimmed_mean', 'outlier_mean' (the mean without outliers) and
+    'outliers' (how many values were left out of it).
+    """
+    _check_trim(trim)
+    members = {}
+    for group, value in zip(groups, values):
+        if group in members:
+            members[group].append(value)
+        else:
+            members[group] = [value]
+
+    table = {}
+    for group, group_values in members.items():
+        count = len(group_values)
+        cut = int(count * trim)
+        ranks = [cut, count - cut - 1]
+        for q in (0.25, 0.5, 0.75):
+            ranks.extend(_quantile_ranks(count, q))
+        ordered = _ranked(group_values, ranks)
+
+        first = quantile(ordered, 0.25)
+        third = quantile(ordered, 0.75)
+        low = first - fence * (third - first)
+        high = third + fence * (third - first)
+        kept = [value for value in group_values
+                if low <= value <= high and (limit is None or value < limit)]
+
+        table[group] = {
+            'count': count,
+            'mean': sum(group_values) / count,
+            'median': quantile(ordered, 0.5),
+            'trimmed_mean': sum(ordered[cut:count - cut]) / (count - 2 * cut),
+            'outlier_mean': sum(kept) / len(kept) if kept else None,
+            'outliers': count - len(kept),
+        }
+
+    return table
+
+
+def robust_ranking(table, metric='trimmed_mean'):
+    """Return ``(value, group)`` pairs of a ``robust_stats`` metric, largest first."""
+    return sorted(((stats[metric], group) for group, stats in table.items()
+                   if stats[metric] is not None), reverse=True)
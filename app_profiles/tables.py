@@ -0,0 +1,190 @@
+"""Frequency tables.
+
+``freq_table`` and ``display_table`` are the dict-based reference
+implementations working on lists of rows. ``column_freq_table`` works on a
+whole column at once and returns the table already sorted. How it counts
+depends on the column:
+
++ label columns stored as integer codes (``codes`` and ``labels``
+  attributes, like the cache's ``LabelColumn``) are counted with
+  ``numpy.bincount``,
++ numeric arrays with ``numpy.unique``,
++ lists with ``collections.Counter``: encoding a list of strings as codes
+  costs more in Python than counting it directly.
+
+NumPy is optional; without it everything is counted with ``Counter``, with
+the same result. Missing ratings are NaN, and no two NaNs are equal: all of
+them are counted as one value, as ``numpy.unique`` does, and sorted after
+the other values with the same percentage.
+"""
+
+from array import array
+from collections import Counter
+
+from app_profiles.report import write_lines
+
+
+def _numpy():
+    """Import NumPy on first use, it takes longer to import than the whole
+    package. Returns None if NumPy isn't installed."""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def percentages(counts, total):
+    """Turn a dict of counts into a dict of percentages of ``total``."""
+    table_percentages = {}
+    for key in counts:
+        percentage = (counts[key] / total) * 100
+        table_percentages[key] = percentage
+
+    return table_percentages
+
+
+def freq_table(dataset, index):
+    """Return the percentage of rows taking each value of column ``index``."""
+    table = {}
+    total = 0
+
+    for row in dataset:
+        total += 1
+        value = row[index]
+        if value in table:
+            table[value] += 1
+        else:
+            table[value] = 1
+
+    return percentages(table, total)
+
+
+def sorted_table(table):
+    """Return a frequency table as (percentage, value) pairs, largest first."""
+    table_display = []
+    for key in table:
+        key_val_as_tuple = (table[key], key)
+        table_display.append(key_val_as_tuple)
+
+    return sorted(table_display, reverse = True)
+
+
+def print_table(entries, file=None, limit=None):
+    """Print (percentage, value) pairs as 'value : percentage' lines.
+
+    Lines are written in buffered batches to ``file`` (default stdout); with
+    ``limit`` only the first ``limit`` entries are printed.
+    """
+    write_lines(('%s : %s' % (entry[1], entry[0]) for entry in entries), file, limit)
+
+
+def display_table(dataset, index, file=None, limit=None):
+    """Print the frequency table of column ``index`` in descending order."""
+    print_table(sorted_table(freq_table(dataset, index)), file, limit)
+
+
+def encode(column):
+    """Encode a column as integer codes.
+
+    Returns ``(codes, labels)`` where ``labels`` is sorted and
+    ``labels[codes[i]] == column[i]``. Encode a column once and pass the
+    result to ``code_freq_table`` to build several tables from it. Codes
+    and labels are NumPy arrays if NumPy is installed, lists otherwise.
+    """
+    numpy = _numpy()
+    if numpy is not None and isinstance(column, (array, memoryview, numpy.ndarray)):
+        labels, codes = numpy.unique(numpy.asarray(column), return_inverse=True)
+        return codes, labels
+
+    # Lists of strings: hashing is much cheaper than numpy's string sort.
+    first_seen = {}
+    for value in column:
+        if value not in first_seen:
+            first_seen[value] = len(first_seen)
+
+    labels = sorted(first_seen)
+    rank = [0] * len(labels)
+    for position, value in enumerate(labels):
+        rank[first_seen[value]] = position
+
+    if numpy is None:
+        return [rank[first_seen[value]] for value in column], labels
+
+    rank = numpy.array(rank, dtype=numpy.intp)
+    codes = numpy.fromiter(map(first_seen.__getitem__, column),
+                           dtype=numpy.intp, count=len(column))
+    return rank[codes], numpy.array(labels, dtype=object)
+
+
+def _scalar(value):
+    """Turn NumPy scalars back into plain Python values."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _merge_nan(counts):
+    """Count every NaN key of ``counts`` under the first one."""
+    nans = [key for key in counts if key != key]
+    if len(nans) > 1:
+        counts[nans[0]] = sum(counts.pop(key) for key in nans)
+    return counts
+
+
+def _entry_order(entry):
+    value = entry[1]
+    if value != value:
+        return entry[0], False, 0
+    return entry[0], True, value
+
+
+def _sorted_counts(counts, labels, total):
+    """Sort the non-zero ``counts`` of ``labels`` into (percentage, value) pairs,
+    ordered like ``sorted_table`` (a NaN value last among equal percentages)."""
+    table = [((int(count) / total) * 100, _scalar(label))
+             for count, label in zip(counts, labels) if count]
+    return sorted(table, key=_entry_order, reverse=True)
+
+
+def code_freq_table(codes, labels):
+    """Frequency table of an encoded column, largest first.
+
+    ``labels[code]`` is the value of ``code``; the labels need not be
+    sorted.
+    """
+    if len(codes) == 0:
+        return []
+
+    numpy = _numpy()
+    if numpy is None:
+        counts = Counter(codes)
+        return _sorted_counts([counts[code] for code in range(len(labels))],
+                              labels, len(codes))
+
+    counts = numpy.bincount(numpy.asarray(codes), minlength=len(labels))
+    return _sorted_counts(counts.tolist(), labels, len(codes))
+
+
+def column_freq_table(column):
+    """Return the frequency table of a column as sorted (percentage, value) pairs.
+
+    Gives the same entries as ``sorted_table(freq_table(rows, index))`` for
+    the matching column of rows, whichever way it is counted (see above).
+    """
+    if len(column) == 0:
+        return []
+
+    if hasattr(column, 'codes'):
+        return code_freq_table(column.codes, column.labels)
+
+    numpy = _numpy()
+    if numpy is not None and isinstance(column, (array, memoryview, numpy.ndarray)):
+        values, counts = numpy.unique(numpy.asarray(column), return_counts=True)
+        return _sorted_counts(counts.tolist(), values.tolist(), len(column))
+
+    counts = _merge_nan(Counter(column))
+    return _sorted_counts(list(counts.values()), list(counts), len(column))
+
+
+def display_column(column, file=None, limit=None):
+    """Print the frequency table of a column in descending order."""
+    print_table(column_freq_table(column), file, limit)
@@ -0,0 +1,130 @@
+"""Schema-driven row validation.
+
+Rows are checked against the header of their data set and the column kinds
+of ``ANDROID_SCHEMA`` / ``IOS_SCHEMA``:
+
++ the row has as many fields as the header,
++ numeric columns parse (with the same parsers ``columnar`` uses),
++ numbers fall in ``RANGES`` (e.g. ratings between 0 and 5; missing 'NaN'
+  ratings are allowed),
++ text matches ``FORMATS`` (e.g. Google Play prices look like '0' or '$4.99').
+
+This catches row 10,472 of the Google Play data set, whose missing
+'Category' shifts every later field, wherever it lands in a fresh export.
+The checks for a header are compiled once, so validating a row is a handful
+of parses and comparisons done in the same pass as reading it.
+
+The pipelines check ``ANDROID_CHECKED`` / ``IOS_CHECKED``: every column of
+``ANDROID_COLUMNS`` / ``IOS_COLUMNS`` that ``columnar`` parses as a number
+or that has a rule, so a row that would make ``columnar`` raise goes to
+``reject`` instead. The other columns are never parsed.
+"""
+
+import re
+from csv import writer
+
+from app_profiles.columns import (
+    ANDROID_COLUMNS,
+    ANDROID_SCHEMA,
+    COLUMN_KINDS,
+    IOS_COLUMNS,
+    IOS_SCHEMA,
+)
+
+RANGES = {
+    'Rating': (0, 5),
+    'user_rating': (0, 5),
+    'user_rating_ver': (0, 5),
+    'price': (0, float('inf')),
+}
+
+FORMATS = {
+    'Price': re.compile(r'0|\$\d+(?:\.\d+)?'),
+}
+
+
+
+def checked_columns(schema, columns=None, ranges=RANGES, formats=FORMATS):
+    """Return the names of ``columns`` (default: all of ``schema``) that need
+    a check: numeric columns and columns with a rule."""
+    if columns is None:
+        columns = list(schema)
+    return tuple(name for name in columns
+                 if schema.get(name, 'text') not in ('text', 'label')
+                 or name in ranges or name in formats)
+
+
+ANDROID_CHECKED = checked_columns(ANDROID_SCHEMA, ANDROID_COLUMNS)
+IOS_CHECKED = checked_columns(IOS_SCHEMA, IOS_COLUMNS)
+
+
+def compile_checks(header, schema, ranges=RANGES, formats=FORMATS, columns=None):
+    """Return the ``(index, name, parse, bounds, pattern)`` checks for a header.
+
+    ``columns`` optionally restricts the checks to the given column names.
+    """
+    checks = []
+    for index, name in enumerate(header):
+        if columns is not None and name not in columns:
+            continue
+        kind = schema.get(name, 'text')
+        parse = None if kind in ('text', 'label') else COLUMN_KINDS[kind][1]
+        bounds = ranges.get(name)
+        pattern = formats.get(name)
+        if parse is not None or bounds is not None or pattern is not None:
+            checks.append((index, name, parse, bounds, pattern))
+
+    return checks
+
+
+def row_error(row, n_columns, checks):
+    """Return the reason ``row`` is invalid, or None if it is valid."""
+    if len(row) != n_columns:
+        return 'expected %d columns, got %d' % (n_columns, len(row))
+
+    for index, name, parse, bounds, pattern in checks:
+        value = row[index]
+        if pattern is not None and pattern.fullmatch(value) is None:
+            return '%s: bad format %r' % (name, value)
+        if parse is None:
+            continue
+        try:
+            number = parse(value)
+        except ValueError:
+            return '%s: not a number %r' % (name, value)
+        if bounds is not None and number == number and not bounds[0] <= number <= bounds[1]:
+            return '%s: %r out of range' % (name, value)
+
+    return None
+
+
+def validated(rows, header, schema, reject=None, columns=None):
+    """Yield the valid rows of ``rows``.
+
+    Invalid rows are passed to ``reject(index, reason, row)``, where
+    ``index`` is the row's position among the data rows, if given.
+    ``columns`` restricts the checks as in ``compile_checks``.
+    """
+    n_columns = len(header)
+    checks = compile_checks(header, schema, columns=columns)
+
+    for index, row in enumerate(rows):
+        error = row_error(row, n_columns, checks)
+        if error is None:
+            yield row
+        elif reject is not None:
+            reject(index, error, row)
+
+
+def reject_writer(opened_file, header):
+    """Return a ``reject`` function writing rejected rows to a CSV file.
+
+    Each line holds the row index, the reason and the row itself.
+    """
+    reject_file = writer(opened_file)
+    reject_file.writerow(['index', 'reason'] + header)
+
+    def reject(index, reason, row):
+        reject_file.writerow([index, reason] + row)
+
+    return reject
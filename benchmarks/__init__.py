@@ -0,0 +1 @@
+"""Benchmarks for the app_profiles pipeline (run ``python -m benchmarks.bench``)."""
@@ -0,0 +1,298 @@
+"""Time and measure every stage of the pipeline on synthetic data sets.
+
+    python -m benchmarks.bench --sizes 10k 1m --label my-change
+    python -m benchmarks.bench --sizes 10k --compare baseline
+
+Data sets are generated once per size into ``--data-dir`` and reused. For
+every stage we record its wall time, its peak traced memory and the number
+of rows it takes and returns. Results are saved as
+``<results-dir>/<label>.json``; ``--compare`` prints the ratio to a saved
+run and flags stages that got slower by more than ``--tolerance``.
+
+Up to ``--materialize-limit`` rows (1m by default) every stage builds its
+full result, as the notebook does, one stage after the other. Larger sizes
+only run the streaming pipelines, instrumented per stage, so their memory
+doesn't grow with the rows. Peak memory is measured with ``tracemalloc`` in
+a second run on a sample of ``--memory-rows`` rows (the ``memory_rows`` of
+a result), unless ``--no-memory``: tracing the full data set would take
+several times as long and as much memory as the timed run.
+
+``--sizes 10m`` needs about 2 GB of disk for the two generated files (about
+115 bytes per Google Play row and 90 per App Store row), several minutes to
+generate them and run, and memory for the first pass of the Google Play
+dedup, which keeps the best score and position of every distinct app name
+(a few hundred bytes per name, and the synthetic names are mostly unique).
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from app_profiles import (
+    ANDROID_CHECKED,
+    ANDROID_COLUMNS,
+    ANDROID_SCHEMA,
+    IOS_CHECKED,
+    IOS_COLUMNS,
+    IOS_SCHEMA,
+    StageProfiler,
+    android_pipeline,
+    column_freq_table,
+    columnar,
+    dedup,
+    english_mask,
+    freq_table,
+    group_by,
+    ios_pipeline,
+    read_header,
+    read_rows,
+    validated,
+)
+from benchmarks.synthetic import write_android, write_ios
+
+SUFFIXES = {'k': 1000, 'm': 1000000}
+
+
+def parse_size(text):
+    """'10k' -> 10000, '1m' -> 1000000, '500' -> 500"""
+    text = text.lower()
+    if text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def measure(function):
+    """Run ``function``, returning its result and seconds."""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def measure_peak(function):
+    """Run ``function`` under ``tracemalloc``, returning its result and peak traced bytes."""
+    tracemalloc.start()
+    try:
+        result = function()
+        return result, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def category_loop(rows):
+    """The notebook's original per-category average loop, for reference."""
+    averages = {}
+    for category in freq_table(rows, 1):
+        total = 0
+        len_category = 0
+        for app in rows:
+            if app[1] == category:
+                total += float(app[5].replace(',', '').replace('+', ''))
+                len_category += 1
+        averages[category] = total / len_category
+    return averages
+
+
+def android_stages(path):
+    """Yield ``(name, function of the previous result, keeps rows)`` for Google Play."""
+    header = read_header(path)
+    yield 'read', lambda _: list(read_rows(path))
+    yield 'validate', lambda rows: list(validated(rows, header, ANDROID_SCHEMA,
+                                                      columns=ANDROID_CHECKED))
+    yield 'dedup', lambda rows: dedup(rows)[0]
+    yield 'is_english', lambda rows: [row for row, keep in
+                                      zip(rows, english_mask([row[0] for row in rows])) if keep]
+    yield 'free', lambda rows: [row for row in rows if row[7] == '0']
+    yield 'category_loop', lambda rows: (category_loop(rows), rows)[1]
+    yield 'freq_table', lambda rows: (freq_table(rows, 1), rows)[1]
+    yield 'columnar', lambda rows: columnar(rows, header, ANDROID_SCHEMA, ANDROID_COLUMNS)
+    yield 'column_freq_table', lambda table: (column_freq_table(table['Category']), table)[1]
+    yield 'group_by', lambda table: (group_by(table['Category'], table['Installs']), table)[1]
+
+
+def ios_stages(path):
+    header = read_header(path)
+    yield 'read', lambda _: list(read_rows(path))
+    yield 'validate', lambda rows: list(validated(rows, header, IOS_SCHEMA,
+                                                      columns=IOS_CHECKED))
+    yield 'is_english', lambda rows: [row for row, keep in
+                                      zip(rows, english_mask([row[1] for row in rows])) if keep]
+    yield 'free', lambda rows: [row for row in rows if row[4] == '0.0']
+    yield 'freq_table', lambda rows: (freq_table(rows, -5), rows)[1]
+    yield 'columnar', lambda rows: columnar(rows, header, IOS_SCHEMA, IOS_COLUMNS)
+    yield 'column_freq_table', lambda table: (column_freq_table(table['prime_genre']), table)[1]
+    yield 'group_by', lambda table: (group_by(table['prime_genre'],
+                                              table['rating_count_tot']), table)[1]
+
+
+def _n_rows(result):
+    if isinstance(result, dict):
+        return len(next(iter(result.values()), ()))
+    return len(result) if result is not None else None
+
+
+def _print(name, stats):
+    print('  %-18s %10.3f s %12s bytes %10s rows'
+          % (name, stats['seconds'], stats['peak_bytes'], stats['rows_out']))
+
+
+def run_stages(stages, sample_stages=None, memory_rows=None):
+    """Run materialising stages one after the other.
+
+    Only the input of the running stage and its result are alive at a time.
+    With ``sample_stages`` (the same stages on a sample file) the peak
+    memory of every stage is measured on the sample.
+    """
+    results = {}
+    data = None
+    for name, stage in stages:
+        rows_in = _n_rows(data)
+        previous, data = data, None
+        data, seconds = measure(lambda: stage(previous))
+        previous = None
+        results[name] = {'seconds': seconds, 'peak_bytes': None, 'memory_rows': None,
+                         'rows_in': rows_in, 'rows_out': _n_rows(data)}
+    data = None
+
+    if sample_stages is not None:
+        for name, stage in sample_stages:
+            previous, data = data, None
+            data, results[name]['peak_bytes'] = measure_peak(lambda: stage(previous))
+            results[name]['memory_rows'] = memory_rows
+            previous = None
+
+    for name, stats in results.items():
+        _print(name, stats)
+    return results
+
+
+def _count(rows):
+    return sum(1 for _ in rows)
+
+
+def run_streamed(pipeline, path, sample_path=None, memory_rows=None):
+    """Run a streaming pipeline without keeping its rows.
+
+    Returns the whole pipeline's stats under 'pipeline' and every stage's
+    under its own name, prefixed with 'stream:'.
+    """
+    with StageProfiler() as profiler:
+        n_rows, seconds = measure(lambda: _count(pipeline(path, profiler=profiler)))
+
+    results = {'pipeline': {'seconds': seconds, 'peak_bytes': None, 'memory_rows': None,
+                            'rows_in': None, 'rows_out': n_rows}}
+    for name, stats in profiler.stages.items():
+        results['stream:' + name] = {'seconds': stats['seconds'], 'peak_bytes': None,
+                                     'memory_rows': None, 'rows_in': stats['rows_in'],
+                                     'rows_out': stats['rows_out']}
+    if sample_path is not None:
+        _, results['pipeline']['peak_bytes'] = measure_peak(lambda: _count(pipeline(sample_path)))
+        results['pipeline']['memory_rows'] = memory_rows
+
+    for name, stats in results.items():
+        _print(name, stats)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, previous, tolerance):
+    """Print the time ratio of every stage to a previous run; return the regressions."""
+    regressions = []
+    for size, stores in current['sizes'].items():
+        for store, stages in stores.items():
+            old_stages = previous['sizes'].get(size, {}).get(store, {})
+            for name, stats in stages.items():
+                if name not in old_stages:
+                    continue
+                ratio = stats['seconds'] / max(old_stages[name]['seconds'], 1e-9)
+                # Stages this short are dominated by noise.
+                slower = ratio > 1 + tolerance and stats['seconds'] > 0.01
+                flag = ' REGRESSION' if slower else ''
+                print('%8s %-8s %-18s %6.2fx%s' % (size, store, name, ratio, flag))
+                if flag:
+                    regressions.append((size, store, name, ratio))
+    return regressions
+
+
+def data_files(data_dir, rows):
+    """Return the paths of the synthetic files of ``rows`` rows, writing them if needed."""
+    android_path = os.path.join(data_dir, 'googleplaystore-%d.csv' % rows)
+    ios_path = os.path.join(data_dir, 'AppleStore-%d.csv' % rows)
+    if not os.path.exists(android_path):
+        write_android(android_path, rows)
+    if not os.path.exists(ios_path):
+        write_ios(ios_path, rows)
+    return android_path, ios_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=['10k'],
+                        help='number of rows, e.g. 10k 1m 10m (default: 10k)')
+    parser.add_argument('--data-dir', default=os.path.join('benchmarks', 'data'))
+    parser.add_argument('--results-dir', default=os.path.join('benchmarks', 'results'))
+    parser.add_argument('--label', default=None, help='name of this run (default: git revision)')
+    parser.add_argument('--compare', default=None, help='label of a saved run to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--no-memory', action='store_true', help='skip the tracemalloc runs')
+    parser.add_argument('--memory-rows', default='100k',
+                        help='size of the sample the memory runs use (default: 100k)')
+    parser.add_argument('--materialize-limit', default='1m',
+                        help='largest size whose stages are run materialised (default: 1m)')
+    args = parser.parse_args(argv)
+
+    label = args.label or git_revision()
+    memory_limit = parse_size(args.memory_rows)
+    materialize_limit = parse_size(args.materialize_limit)
+    os.makedirs(args.data_dir, exist_ok=True)
+    report = {'label': label, 'revision': git_revision(), 'python': platform.python_version(),
+              'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'sizes': {}}
+
+    for size in args.sizes:
+        rows = parse_size(size)
+        android_path, ios_path = data_files(args.data_dir, rows)
+        memory_rows = min(rows, memory_limit)
+        android_sample = ios_sample = None
+        if not args.no_memory:
+            android_sample, ios_sample = data_files(args.data_dir, memory_rows)
+        materialize = rows <= materialize_limit
+
+        print('%d rows, Google Play:' % rows)
+        android = {}
+        if materialize:
+            samples = None if android_sample is None else android_stages(android_sample)
+            android = run_stages(android_stages(android_path), samples, memory_rows)
+        android.update(run_streamed(android_pipeline, android_path, android_sample, memory_rows))
+
+        print('%d rows, App Store:' % rows)
+        ios = {}
+        if materialize:
+            samples = None if ios_sample is None else ios_stages(ios_sample)
+            ios = run_stages(ios_stages(ios_path), samples, memory_rows)
+        ios.update(run_streamed(ios_pipeline, ios_path, ios_sample, memory_rows))
+        report['sizes'][str(rows)] = {'android': android, 'ios': ios}
+
+    os.makedirs(args.results_dir, exist_ok=True)
+    with open(os.path.join(args.results_dir, label + '.json'), 'w') as results_file:
+        json.dump(report, results_file, indent=2)
+
+    if args.compare:
+        with open(os.path.join(args.results_dir, args.compare + '.json')) as results_file:
+            if compare(report, json.load(results_file), args.tolerance):
+                return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Synthetic store exports with the schemas of googleplaystore.csv and AppleStore.csv.
+
+The generated files mimic what makes the real data sets expensive to clean:
+about 11% of the Google Play rows are duplicates of an earlier app with a
+different number of reviews, a few percent of the names are not English,
+installs follow the usual open-ended buckets, most apps are free, and one
+Google Play row is missing its 'Category' like row 10,472 of the real file.
+Files are written row by row, so 10 million rows don't need 10 million rows
+of memory.
+"""
+
+import random
+from csv import writer
+
+ANDROID_HEADER = ['App', 'Category', 'Rating', 'Reviews', 'Size', 'Installs', 'Type',
+                  'Price', 'Content Rating', 'Genres', 'Last Updated', 'Current Ver',
+                  'Android Ver']
+
+IOS_HEADER = ['id', 'track_name', 'size_bytes', 'currency', 'price', 'rating_count_tot',
+              'rating_count_ver', 'user_rating', 'user_rating_ver', 'ver', 'cont_rating',
+              'prime_genre', 'sup_devices.num', 'ipadSc_urls.num', 'lang.num', 'vpp_lic']
+
+CATEGORIES = {
+    'FAMILY': 18.9, 'GAME': 9.7, 'TOOLS': 8.5, 'BUSINESS': 4.6, 'LIFESTYLE': 3.9,
+    'PRODUCTIVITY': 3.9, 'FINANCE': 3.7, 'MEDICAL': 3.5, 'SPORTS': 3.4,
+    'PERSONALIZATION': 3.3, 'COMMUNICATION': 3.2, 'HEALTH_AND_FITNESS': 3.1,
+    'PHOTOGRAPHY': 2.9, 'NEWS_AND_MAGAZINES': 2.8, 'SOCIAL': 2.7,
+    'TRAVEL_AND_LOCAL': 2.3, 'SHOPPING': 2.2, 'BOOKS_AND_REFERENCE': 2.1,
+    'DATING': 1.9, 'VIDEO_PLAYERS': 1.8, 'MAPS_AND_NAVIGATION': 1.4,
+    'FOOD_AND_DRINK': 1.2, 'EDUCATION': 1.2, 'ENTERTAINMENT': 1.0,
+    'LIBRARIES_AND_DEMO': 0.9, 'AUTO_AND_VEHICLES': 0.9, 'HOUSE_AND_HOME': 0.8,
+    'WEATHER': 0.8, 'EVENTS': 0.7, 'PARENTING': 0.7, 'ART_AND_DESIGN': 0.6,
+    'COMICS': 0.6, 'BEAUTY': 0.6,
+}
+
+INSTALLS = {
+    '0+': 0.5, '1+': 0.5, '5+': 0.8, '10+': 3.5, '50+': 2.0, '100+': 7.0,
+    '500+': 3.3, '1,000+': 8.5, '5,000+': 4.5, '10,000+': 10.2, '50,000+': 5.0,
+    '100,000+': 11.6, '500,000+': 5.6, '1,000,000+': 15.7, '5,000,000+': 6.8,
+    '10,000,000+': 10.5, '50,000,000+': 2.3, '100,000,000+': 2.1,
+    '500,000,000+': 0.3, '1,000,000,000+': 0.2,
+}
+
+GENRES = {
+    'Games': 58.2, 'Entertainment': 7.9, 'Photo & Video': 5.0, 'Education': 3.7,
+    'Social Networking': 3.3, 'Shopping': 2.6, 'Utilities': 2.5, 'Sports': 2.1,
+    'Music': 2.0, 'Health & Fitness': 2.0, 'Productivity': 1.7, 'Lifestyle': 1.6,
+    'News': 1.3, 'Travel': 1.2, 'Finance': 1.1, 'Weather': 0.9, 'Food & Drink': 0.8,
+    'Reference': 0.6, 'Business': 0.5, 'Book': 0.4, 'Navigation': 0.2,
+    'Medical': 0.2, 'Catalogs': 0.1,
+}
+
+WORDS = ['Photo', 'Editor', 'Music', 'Player', 'Video', 'Chat', 'Messenger', 'Bible',
+         'Dictionary', 'Quran', 'Weather', 'Maps', 'Fitness', 'Coach', 'Recipes',
+         'Puzzle', 'Racing', 'Manager', 'Scanner', 'Notes', 'Calendar', 'Keyboard',
+         'Launcher', 'Theme', 'News', 'Radio', 'Camera', 'Wallpaper', 'Budget', 'Pro',
+         'Free', 'Lite', 'Plus', 'Kids', 'Learn', 'English', 'Stories', 'Books']
+
+NON_ENGLISH = '爱奇艺电视剧热播欢乐颂中国日本語한국어русскийالعربية'
+SYMBOLS = ['™', '😜', '®', '❤']
+
+
+def _weighted(rng, table):
+    values = list(table)
+    weights = list(table.values())
+    return lambda: rng.choices(values, weights)[0]
+
+
+def app_name(rng, number, non_english_rate):
+    """A random app name; unique per ``number``."""
+    if rng.random() < non_english_rate:
+        return ''.join(rng.choice(NON_ENGLISH) for _ in range(rng.randint(4, 12))) + ' %d' % number
+    name = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) + ' %d' % number
+    if rng.random() < 0.02:
+        name += ' ' + rng.choice(SYMBOLS)
+    return name
+
+
+def write_android(path, rows, seed=0, duplicate_rate=0.11, non_english_rate=0.005):
+    """Write ``rows`` synthetic Google Play rows (plus the header) to ``path``."""
+    rng = random.Random(seed)
+    category = _weighted(rng, CATEGORIES)
+    installs = _weighted(rng, INSTALLS)
+    apps = []
+    bad_row = int(rows * 0.966)
+
+    with open(path, 'w', encoding='utf8', newline='') as opened_file:
+        csv_file = writer(opened_file)
+        csv_file.writerow(ANDROID_HEADER)
+        for number in range(rows):
+            if number == bad_row:
+                csv_file.writerow(['Life Made WI-Fi Touchscreen Photo Frame', '1.9', '19',
+                                   '3.0M', '1,000+', 'Free', '0', 'Everyone', '',
+                                   'February 11, 2018', '1.0.19', '4.0 and up'])
+                continue
+
+            if apps and rng.random() < duplicate_rate:
+                row = list(rng.choice(apps))
+                row[3] = str(max(0, int(row[3]) + rng.randint(-50, 500)))
+            else:
+                row_category = category()
+                paid = rng.random() < 0.074
+                row = [app_name(rng, number, non_english_rate), row_category,
+                       'NaN' if rng.random() < 0.136 else '%.1f' % rng.uniform(1, 5),
+                       str(int(rng.lognormvariate(7, 3)) % 80000000),
+                       '%dM' % rng.randint(1, 100), installs(),
+                       'Paid' if paid else 'Free',
+                       '$%d.99' % rng.randint(0, 9) if paid else '0',
+                       rng.choice(['Everyone', 'Teen', 'Mature 17+', 'Everyone 10+']),
+                       row_category.title().replace('_', ' '),
+                       'January %d, 2018' % rng.randint(1, 31),
+                       '%d.%d' % (rng.randint(1, 9), rng.randint(0, 9)),
+                       '4.0 and up']
+                if len(apps) < 100000:
+                    apps.append(row)
+                else:
+                    apps[rng.randrange(len(apps))] = row
+            csv_file.writerow(row)
+
+
+def write_ios(path, rows, seed=0, non_english_rate=0.14):
+    """Write ``rows`` synthetic App Store rows (plus the header) to ``path``."""
+    rng = random.Random(seed)
+    genre = _weighted(rng, GENRES)
+
+    with open(path, 'w', encoding='utf8', newline='') as opened_file:
+        csv_file = writer(opened_file)
+        csv_file.writerow(IOS_HEADER)
+        for number in range(rows):
+            rating_count = int(rng.lognormvariate(5, 3)) % 3000000
+            csv_file.writerow([
+                str(280000000 + number), app_name(rng, number, non_english_rate),
+                str(rng.randint(1000000, 900000000)), 'USD',
+                '0.0' if rng.random() < 0.56 else '%d.99' % rng.randint(0, 9),
+                str(rating_count), str(rating_count // rng.randint(1, 50)),
+                str(rng.randint(0, 10) / 2), str(rng.randint(0, 10) / 2),
+                '%d.%d' % (rng.randint(1, 9), rng.randint(0, 9)),
+                rng.choice(['4+', '9+', '12+', '17+']), genre(),
+                str(rng.choice([37, 38, 40, 43])), str(rng.randint(0, 5)),
+                str(rng.randint(1, 20)), '1',
+            ])
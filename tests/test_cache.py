@@ -0,0 +1,92 @@
+import math
+import os
+
+import pytest
+
+from app_profiles import cache
+from app_profiles.cache import cache_key, cached_columns
+from app_profiles.columns import ANDROID_COLUMNS, ANDROID_SCHEMA, columnar
+from app_profiles.pipeline import android_pipeline, read_header
+from benchmarks.synthetic import write_android
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = str(tmp_path / 'android.csv')
+    write_android(path, 500, seed=12)
+    return path
+
+
+def entries(cache_dir):
+    return sorted(os.listdir(cache_dir))
+
+
+def same_values(first, second):
+    return [repr(value) for value in first] == [repr(value) for value in second]
+
+
+def test_round_trip(source, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    expected = columnar(android_pipeline(source), read_header(source), ANDROID_SCHEMA,
+                        ANDROID_COLUMNS)
+    table = cached_columns(source, 'android', cache_dir=cache_dir)
+    assert any(math.isnan(value) for value in expected['Rating'])
+    assert list(table) == list(expected)
+    for name in expected:
+        assert same_values(table[name], expected[name])
+
+    # A warm start maps the same entry.
+    first_entries = entries(cache_dir)
+    again = cached_columns(source, 'android', cache_dir=cache_dir)
+    assert entries(cache_dir) == first_entries
+    for name in expected:
+        assert same_values(again[name], expected[name])
+
+
+def test_new_key_for_new_content_or_settings(source):
+    key = cache_key(source, 'android')
+    assert cache_key(source, 'android', threshold=0) != key
+    assert cache_key(source, 'ios') != key
+    with open(source, 'a', encoding='utf8') as opened_file:
+        opened_file.write('Extra app,GAME,4.0,5,1M,10+,Free,0,Everyone,Puzzle,'
+                          '"May 1, 2018",1.0,4.0 and up\n')
+    assert cache_key(source, 'android') != key
+
+
+def test_changed_source_replaces_its_entry(source, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    other = str(tmp_path / 'other' / 'android.csv')
+    os.makedirs(os.path.dirname(other))
+    write_android(other, 300, seed=13)
+
+    cached_columns(source, 'android', cache_dir=cache_dir)
+    cached_columns(other, 'android', cache_dir=cache_dir)
+    first_entries = entries(cache_dir)
+    assert len(first_entries) == 2
+
+    write_android(source, 400, seed=14)
+    table = cached_columns(source, 'android', cache_dir=cache_dir)
+    assert len(table['App']) == sum(1 for _ in android_pipeline(source))
+    new_entries = entries(cache_dir)
+    assert len(new_entries) == 2
+    assert len(set(new_entries) & set(first_entries)) == 1
+
+
+def test_entry_is_written_to_a_temporary_directory_first(source, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+
+    def fail(directory, table, schema):
+        os.makedirs(directory)
+        raise OSError('disk full')
+
+    monkeypatch.setattr(cache, 'write_entry', fail)
+    with pytest.raises(OSError):
+        cached_columns(source, 'android', cache_dir=cache_dir)
+    assert all('.tmp-' in entry for entry in entries(cache_dir))
+
+    # A temporary directory left by a crashed run is removed with the retry.
+    monkeypatch.undo()
+    cached_columns(source, 'android', cache_dir=cache_dir)
+    complete = entries(cache_dir)
+    assert len(complete) == 1 and '.tmp-' not in complete[0]
+    assert os.path.exists(os.path.join(cache_dir, complete[0], 'meta.json'))
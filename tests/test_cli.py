@@ -0,0 +1,94 @@
+import csv
+import json
+
+import pytest
+
+from app_profiles.cache import cached_columns
+from app_profiles.columns import IOS_COLUMNS
+from app_profiles.cli import main
+from app_profiles.pipeline import ios_pipeline
+from benchmarks.synthetic import write_android, write_ios
+
+
+def write_ios_with_bad_value(path, index, value, rows=200):
+    """Write an App Store file whose first free English app has ``value`` in
+    column ``index``; return the app's id."""
+    write_ios(path, rows, seed=6)
+    bad_id = next(ios_pipeline(path))[0]
+    with open(path, encoding='utf8', newline='') as opened_file:
+        lines = list(csv.reader(opened_file))
+    for line in lines:
+        if line[0] == bad_id:
+            line[index] = value
+    with open(path, 'w', encoding='utf8', newline='') as opened_file:
+        csv.writer(opened_file).writerows(lines)
+    return bad_id
+
+
+def test_cli_rejects_bad_numbers_instead_of_crashing(tmp_path, capsys):
+    path = str(tmp_path / 'ios.csv')
+    bad_id = write_ios_with_bad_value(path, 5, '12k')
+    rejects = str(tmp_path / 'rej')
+
+    assert main(['--ios', path, '--stages', 'clean', '--rejects', rejects]) == 0
+    with open(rejects + '.ios', encoding='utf8', newline='') as opened_file:
+        lines = list(csv.reader(opened_file))
+    assert [line[1:3] for line in lines[1:]] == [["rating_count_tot: not a number '12k'", bad_id]]
+    assert 'Number of apps:' in capsys.readouterr().out
+
+
+def test_cache_drops_bad_numbers(tmp_path):
+    path = str(tmp_path / 'ios.csv')
+    bad_id = write_ios_with_bad_value(path, 5, '12k')
+
+    table = cached_columns(path, 'ios', cache_dir=str(tmp_path / 'cache'))
+    assert bad_id not in list(table['id'])
+    assert len(table['id']) == sum(1 for _ in ios_pipeline(path))
+
+
+def test_cache_keeps_only_the_columns_used(tmp_path):
+    path = str(tmp_path / 'ios.csv')
+    kept_id = write_ios_with_bad_value(path, 2, '12MB')
+
+    table = cached_columns(path, 'ios', cache_dir=str(tmp_path / 'cache'))
+    assert list(table) == IOS_COLUMNS
+    assert kept_id in list(table['id'])
+
+
+@pytest.mark.parametrize('argv, message', [
+    ([], 'give at least one of --android and --ios'),
+    (['--ios', 'ios.csv', '--profile'], '--profile needs --profile-json'),
+    (['--ios', 'ios.csv', '--cache', '--rejects', 'rej'], '--rejects cannot be used with --cache'),
+])
+def test_bad_option_combinations(argv, message, capsys):
+    with pytest.raises(SystemExit) as error:
+        main(argv)
+    assert error.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_profiles_stage_reports_it_needs_both_stores(tmp_path, capsys):
+    path = str(tmp_path / 'ios.csv')
+    write_ios(path, 200, seed=6)
+
+    assert main(['--ios', path, '--stages', 'clean', 'profiles']) == 0
+    out = capsys.readouterr().out
+    assert '### profiles ###\nskipped: needs both --android and --ios' in out
+
+
+def test_all_stages_with_and_without_the_cache(tmp_path, capsys):
+    android = str(tmp_path / 'android.csv')
+    ios = str(tmp_path / 'ios.csv')
+    write_android(android, 500, seed=3)
+    write_ios(ios, 500, seed=6)
+    profile = str(tmp_path / 'profile.json')
+    argv = ['--android', android, '--ios', ios, '--limit', '5']
+
+    assert main(argv + ['--profile-json', profile]) == 0
+    out = capsys.readouterr().out
+    assert '### profiles ###' in out and 'skipped' not in out
+    with open(profile, encoding='utf8') as opened_file:
+        assert json.load(opened_file)
+
+    assert main(argv + ['--cache', '--cache-dir', str(tmp_path / 'cache')]) == 0
+    assert capsys.readouterr().out == out
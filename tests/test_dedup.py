@@ -0,0 +1,35 @@
+from app_profiles.dedup import dedup, dedup_winners, merge_winners
+from app_profiles.fuzzy import fuzzy_dedup
+from app_profiles.pipeline import winner_positions, winners_only
+
+ROWS = [
+    ['Notes', 'TOOLS', '4.0', '10'],
+    ['Chat', 'SOCIAL', '4.0', '5'],
+    ['Notes', 'TOOLS', '4.1', '12'],
+    ['Chat', 'SOCIAL', '4.1', '5'],
+    ['Notes', 'TOOLS', '4.2', '12'],
+    ['Maps', 'TRAVEL', '4.3', '1'],
+]
+EXPECTED = [ROWS[1], ROWS[2], ROWS[5]]
+
+
+def test_highest_score_wins_and_ties_keep_the_earliest_row():
+    clean, report = dedup(ROWS)
+    assert clean == EXPECTED
+    assert report == {'duplicates': 3, 'examples': ['Notes', 'Chat', 'Notes']}
+
+
+def test_every_dedup_applies_the_same_policy():
+    report = {}
+    positions = winner_positions(ROWS, report=report)
+    assert list(winners_only(ROWS, positions)) == EXPECTED
+    assert report == dedup(ROWS)[1]
+    assert fuzzy_dedup(ROWS)[0] == EXPECTED
+
+
+def test_merged_halves_give_the_winners_of_the_whole():
+    first, _ = dedup_winners(ROWS[:3])
+    second, _ = dedup_winners(ROWS[3:])
+    for best in second.values():
+        best[1] += 3
+    assert merge_winners(first, second) == dedup_winners(ROWS)[0]
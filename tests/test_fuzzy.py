@@ -0,0 +1,66 @@
+import itertools
+import random
+
+from app_profiles.fuzzy import (
+    DEDUP_FILLER_WORDS,
+    _NUMBER,
+    _similarity,
+    fuzzy_dedup,
+    name_grams,
+    near_duplicate_labels,
+)
+from app_profiles.matching import normalize_name
+
+WORDS = ['sudoku', 'notes', 'chat', 'scanner', 'recipes', 'kids', 'puzzle', 'english',
+         'fitness', 'manager', 'photo', 'editor', 'music', 'player', 'bible', 'quran']
+SUFFIXES = [' – Free', ' 🎲', '!', ' free', '']
+
+
+def app(name, reviews):
+    return [name, 'GAME', '4.0', str(reviews), '1M', '1,000+', 'Free', '0']
+
+
+def test_variants_are_merged():
+    names = ['Sudoku Free', 'Sudoku – Free 🎲', 'sudoku!', 'FIFA 18', 'FIFA 19']
+    assert near_duplicate_labels(names) == [0, 0, 0, 3, 4]
+
+
+def test_lite_and_hd_apps_are_kept():
+    assert near_duplicate_labels(['Facebook', 'Facebook Lite', 'Netflix', 'Netflix HD']) == [0, 1, 2, 3]
+
+
+def test_empty_normalised_names_only_match_themselves():
+    assert near_duplicate_labels(['😜', '❤', '★★', '😜', '']) == [0, 1, 2, 0, 4]
+
+
+def test_keeps_highest_review_row():
+    rows = [app('Sudoku', 10), app('Sudoku – Free', 30), app('Chess', 5), app('sudoku!', 30)]
+    clean, report = fuzzy_dedup(rows)
+    assert clean == [rows[1], rows[2]]
+    assert report['duplicates'] == 2
+    assert report['examples'] == [['Sudoku', 'Sudoku – Free', 'sudoku!']]
+
+
+def test_matches_brute_force():
+    rng = random.Random(0)
+    names = []
+    for _ in range(600):
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        if rng.random() < 0.5:
+            words.append(str(rng.randint(1, 20)))
+        names.append(' '.join(words).title() + rng.choice(SUFFIXES))
+    # Misspellings, to have pairs that only the n-gram similarity finds.
+    names += [name[:-1] for name in rng.sample(names, 100)]
+
+    labels = near_duplicate_labels(names)
+
+    keys = {}
+    for name, label in zip(names, labels):
+        keys.setdefault(normalize_name(name, DEDUP_FILLER_WORDS), set()).add(label)
+    assert all(len(key_labels) == 1 for key_labels in keys.values())
+
+    grams = {key: name_grams(key) for key in keys}
+    for key, other in itertools.combinations(keys, 2):
+        if (_NUMBER.findall(key) == _NUMBER.findall(other)
+                and _similarity(grams[key], grams[other]) >= 0.8):
+            assert keys[key] == keys[other], (key, other)
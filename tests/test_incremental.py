@@ -0,0 +1,72 @@
+import pytest
+
+from app_profiles import ANDROID_SCHEMA, columnar, freq_table, group_by
+from app_profiles.incremental import (
+    apply_delta,
+    close_state,
+    load_state,
+    save_state,
+    state_freq_table,
+    state_means,
+    state_rows,
+)
+from app_profiles.pipeline import android_pipeline, read_header, read_rows
+from benchmarks.synthetic import write_android
+
+
+def test_chunked_deltas_match_the_full_pipeline(tmp_path):
+    path = str(tmp_path / 'android.csv')
+    write_android(path, 3000, seed=9)
+    header = read_header(path)
+    rows = list(read_rows(path))
+    state_path = str(tmp_path / 'state.db')
+
+    for start in range(0, len(rows), 700):
+        state = load_state(state_path, 'android', header)
+        apply_delta(state, rows[start:start + 700])
+        save_state(state)
+        close_state(state)
+
+    state = load_state(state_path, 'android', header)
+    expected = list(android_pipeline(path))
+    table = columnar(expected, header, ANDROID_SCHEMA)
+    assert state_rows(state) == expected
+    assert state_freq_table(state, 'Category') == freq_table(expected, 1)
+    means = {group: stats['mean'] for group, stats in
+             group_by(table['Category'], table['Installs']).items()}
+    assert state_means(state, 'Category', 'Installs') == pytest.approx(means)
+    close_state(state)
+
+
+def test_unsaved_changes_are_discarded(tmp_path):
+    path = str(tmp_path / 'android.csv')
+    write_android(path, 200, seed=10)
+    header = read_header(path)
+    rows = list(read_rows(path))
+    state_path = str(tmp_path / 'state.db')
+
+    state = load_state(state_path, 'android', header)
+    apply_delta(state, rows[:100])
+    save_state(state)
+    apply_delta(state, rows[100:])
+    close_state(state)
+
+    state = load_state(state_path, 'android', header)
+    assert state['rows_seen'] == 100
+    assert len(state_rows(state)) == state['n_kept']
+    close_state(state)
+
+
+def test_state_of_another_data_set_is_refused(tmp_path):
+    path = str(tmp_path / 'android.csv')
+    write_android(path, 10, seed=11)
+    header = read_header(path)
+    state_path = str(tmp_path / 'state.db')
+
+    state = load_state(state_path, 'android', header)
+    save_state(state)
+    close_state(state)
+    with pytest.raises(ValueError):
+        load_state(state_path, 'ios', header)
+    with pytest.raises(ValueError):
+        load_state(state_path, 'android', header[:-1])
@@ -0,0 +1,35 @@
+from app_profiles.matching import match_apps, matched_profiles, normalize_name
+
+
+def test_normalize_name():
+    assert normalize_name('Docs To Go™ Free') == 'docs to go'
+    assert normalize_name('😜') == ''
+
+
+def test_exact_and_similar_matches():
+    android = ['Docs To Go™ Free', 'Kindle Reader', 'Weather Now']
+    categories = ['PRODUCTIVITY', 'BOOKS_AND_REFERENCE', 'WEATHER']
+    ios = ['Docs To Go', 'Kindle Reader Books', 'Weather Now Pro', 'Chess']
+    genres = ['Productivity', 'Book', 'Weather', 'Games']
+    matches = match_apps(android, categories, ios, genres)
+    assert [(android_id, ios_id) for android_id, ios_id, _ in matches] == [(0, 0), (1, 1), (2, 2)]
+    assert matches[0][2] == 1.0
+
+
+def test_emoji_names_do_not_match():
+    assert match_apps(['😜'], ['GAME'], ['❤'], ['Games']) == []
+
+
+def test_matches_are_one_to_one():
+    android = ['Sudoku', 'Sudoku Puzzle Game']
+    categories = ['GAME', 'GAME']
+    ios = ['Sudoku', 'Sudoku Free', 'Sudoku Puzzle']
+    genres = ['Games', 'Games', 'Games']
+    matches = match_apps(android, categories, ios, genres)
+    assert [(android_id, ios_id) for android_id, ios_id, _ in matches] == [(0, 0), (1, 2)]
+
+    android_columns = {'Category': categories, 'Installs': [100, 1000]}
+    ios_columns = {'rating_count_tot': [10, 20, 30]}
+    profiles = matched_profiles(matches, android_columns, ios_columns)
+    assert profiles == {'GAME': {'matches': 2, 'android_installs': 550.0,
+                                 'ios_rating_count': 20.0}}
@@ -0,0 +1,75 @@
+from app_profiles.aggregate import group_by
+from app_profiles.memo import ResultCache, result_size
+from app_profiles.tables import column_freq_table
+
+
+def test_repeated_calls_are_hits():
+    results = ResultCache()
+    groups = ['a', 'b', 'a']
+    values = [1, 2, 3]
+    assert results.group_by(groups, values) == group_by(groups, values)
+    assert results.group_by(groups, values) is results.group_by(groups, values)
+    info = results.info()
+    assert (info.hits, info.misses, info.entries) == (2, 1, 1)
+
+
+def test_least_recently_used_result_is_evicted():
+    results = ResultCache(max_entries=2)
+    first, second, third = ['a'], ['b'], ['c']
+    results.column_freq_table(first)
+    results.column_freq_table(second)
+    results.column_freq_table(first)
+    results.column_freq_table(third)
+    assert results.info().evictions == 1
+
+    misses = results.info().misses
+    results.column_freq_table(first)
+    results.column_freq_table(third)
+    assert results.info().misses == misses
+    results.column_freq_table(second)
+    assert results.info().misses == misses + 1
+
+
+def test_max_bytes():
+    column = ['genre%d' % value for value in range(50)]
+    size = result_size(column_freq_table(column))
+    results = ResultCache(max_bytes=size * 3 // 2)
+    results.column_freq_table(column)
+    results.column_freq_table(column[:49])
+    results.column_freq_table(column[:48])
+    info = results.info()
+    assert info.entries == 1 and info.evictions == 2
+    assert info.bytes <= size * 3 // 2
+
+    # Results larger than the cache are returned but not kept.
+    small = ResultCache(max_bytes=size - 1)
+    assert small.column_freq_table(column) == column_freq_table(column)
+    assert small.info().entries == small.info().bytes == 0
+
+
+def test_invalidate_one_dataset_or_all():
+    results = ResultCache()
+    groups = ['a', 'b']
+    values = [1, 2]
+    results.group_by(groups, values)
+    results.column_freq_table(groups)
+    results.column_freq_table(values)
+
+    values[0] = 5
+    results.invalidate(values)
+    assert results.info().entries == 1
+    assert results.group_by(groups, values)['a']['mean'] == 5
+    results.column_freq_table(groups)
+    assert results.info().hits == 1
+
+    results.invalidate()
+    assert results.info().entries == results.info().bytes == 0
+
+
+def test_changed_length_gives_a_new_result():
+    results = ResultCache()
+    column = ['a', 'b']
+    assert results.column_freq_table(column) == column_freq_table(['a', 'b'])
+    column.append('a')
+    assert results.column_freq_table(column) == column_freq_table(['a', 'b', 'a'])
+    assert results.info().misses == 2
@@ -0,0 +1,63 @@
+from app_profiles.language import EMOJI
+from app_profiles.parallel import parallel_android_pipeline, parallel_ios_pipeline
+from app_profiles.pipeline import android_pipeline, ios_pipeline
+from benchmarks.synthetic import write_android, write_ios
+
+
+def add_bad_rows(path, every=400):
+    """Insert a row with too few fields every ``every`` lines, so that
+    several shards have rejects."""
+    with open(path, encoding='utf8') as opened_file:
+        lines = opened_file.readlines()
+    with open(path, 'w', encoding='utf8') as opened_file:
+        for number, line in enumerate(lines):
+            if number and number % every == 0:
+                opened_file.write('bad,row\n')
+            opened_file.write(line)
+
+
+def collect(pipeline, path, **kwargs):
+    rejects = []
+    rows = list(pipeline(path, reject=lambda *reject: rejects.append(reject), **kwargs))
+    return rows, rejects
+
+
+def test_parallel_android_pipeline_matches_serial(tmp_path):
+    path = str(tmp_path / 'android.csv')
+    write_android(path, 3000, seed=4)
+    add_bad_rows(path)
+
+    report = {}
+    expected_report = {}
+    rows, rejects = collect(parallel_android_pipeline, path, workers=2, n_shards=5,
+                            report=report)
+    expected, expected_rejects = collect(android_pipeline, path, report=expected_report)
+    assert rows == expected
+    assert rejects == expected_rejects
+    assert len(rejects) > 5
+    assert report == expected_report
+
+
+def test_parallel_ios_pipeline_matches_serial(tmp_path):
+    path = str(tmp_path / 'ios.csv')
+    write_ios(path, 3000, seed=5)
+    add_bad_rows(path)
+
+    rows, rejects = collect(parallel_ios_pipeline, path, workers=2, n_shards=5)
+    assert (rows, rejects) == collect(ios_pipeline, path)
+    assert len(rejects) > 5
+
+
+def test_parallel_pipelines_pass_on_the_english_settings(tmp_path):
+    android_path = str(tmp_path / 'android.csv')
+    ios_path = str(tmp_path / 'ios.csv')
+    write_android(android_path, 2000, seed=7)
+    write_ios(ios_path, 2000, seed=8)
+    settings = {'threshold': 0, 'allowed': EMOJI}
+
+    assert (parallel_android_pipeline(android_path, workers=2, n_shards=3, **settings)
+            == list(android_pipeline(android_path, **settings)))
+    assert (parallel_ios_pipeline(ios_path, workers=2, n_shards=3, **settings)
+            == list(ios_pipeline(ios_path, **settings)))
+    assert (parallel_ios_pipeline(ios_path, workers=2, n_shards=3, **settings)
+            != parallel_ios_pipeline(ios_path, workers=2, n_shards=3))
@@ -0,0 +1,41 @@
+from app_profiles import ANDROID_SCHEMA, dedup, read_header, read_rows, validated
+from app_profiles.language import english_classifier
+from app_profiles.pipeline import android_pipeline, ios_pipeline
+from app_profiles.stages import StageProfiler
+from benchmarks.synthetic import write_android, write_ios
+
+
+def clean_in_memory(path):
+    rows = list(validated(read_rows(path), read_header(path), ANDROID_SCHEMA))
+    clean, report = dedup(rows)
+    classify = english_classifier()
+    return [row for row in clean if classify(row[0]) and row[7] == '0'], report
+
+
+def test_android_pipeline_matches_in_memory_cleaning(tmp_path):
+    path = str(tmp_path / 'android.csv')
+    write_android(path, 3000, seed=1)
+    expected, expected_report = clean_in_memory(path)
+
+    report = {}
+    rejects = []
+    rows = list(android_pipeline(path, report=report,
+                                 reject=lambda index, reason, row: rejects.append(index)))
+    assert rows == expected
+    assert report == expected_report
+    assert len(rejects) == 1
+
+
+def test_android_pipeline_profiled_stages(tmp_path):
+    path = str(tmp_path / 'android.csv')
+    write_android(path, 1000, seed=2)
+    with StageProfiler() as profiler:
+        rows = list(android_pipeline(path, profiler=profiler))
+    assert profiler.stages['read']['rows_out'] == 1000
+    assert profiler.stages['free']['rows_out'] == len(rows)
+
+
+def test_ios_pipeline_keeps_free_rows(tmp_path):
+    path = str(tmp_path / 'ios.csv')
+    write_ios(path, 1000, seed=3)
+    assert all(row[4] == '0.0' for row in ios_pipeline(path))
@@ -0,0 +1,40 @@
+from array import array
+
+from app_profiles.query import Query, col
+
+TABLE = {
+    'App': ['Chess', 'Sudoku', 'Maps', 'Chat'],
+    'Category': ['GAME', 'GAME', 'MAPS_AND_NAVIGATION', 'COMMUNICATION'],
+    'Installs': array('q', [100, 1000, 500, 10]),
+    'Price': array('d', [0.0, 1.99, 0.0, 0.0]),
+}
+
+
+def test_filters_run_together():
+    query = Query(TABLE).filter(col('Price') == 0).filter(col('Installs') >= 100)
+    assert list(query.row_ids()) == [0, 2]
+    assert query.count() == 2
+    assert query.mean('Installs') == 300
+
+
+def test_predicates_combine():
+    query = Query(TABLE).filter((col('Category') == 'GAME') | ~(col('Installs') > 50))
+    assert list(query.values('App')) == ['Chess', 'Sudoku', 'Chat']
+
+
+def test_collect_keeps_column_types():
+    table = Query(TABLE).filter(col('Category').isin(['GAME'])).collect()
+    assert table['App'] == ['Chess', 'Sudoku']
+    assert table['Installs'] == array('q', [100, 1000])
+
+
+def test_group_by():
+    grouped = Query(TABLE).filter(col('Price') == 0).group_by('Category')
+    assert grouped.mean('Installs') == {'GAME': 100, 'MAPS_AND_NAVIGATION': 500,
+                                        'COMMUNICATION': 10}
+    assert grouped.count() == {'GAME': 1, 'MAPS_AND_NAVIGATION': 1, 'COMMUNICATION': 1}
+
+
+def test_columns_are_hashable():
+    price = col('Price')
+    assert {price: 1}[price] == 1
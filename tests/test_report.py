@@ -0,0 +1,20 @@
+import json
+from array import array
+
+from app_profiles.report import export_rows, export_table
+
+
+def test_json_exports_write_nan_as_null(tmp_path):
+    path = str(tmp_path / 'rows.json')
+    export_rows(path, [['A', float('nan')], ['B', 4.5]], ['App', 'Rating'])
+    with open(path, encoding='utf8') as opened_file:
+        assert json.load(opened_file) == [{'App': 'A', 'Rating': None},
+                                          {'App': 'B', 'Rating': 4.5}]
+
+
+def test_jsonl_export_of_a_table(tmp_path):
+    path = str(tmp_path / 'table.jsonl')
+    export_table(path, {'App': ['A', 'B'], 'Rating': array('d', [float('inf'), 3.0])})
+    with open(path, encoding='utf8') as opened_file:
+        assert [json.loads(line) for line in opened_file] == [{'App': 'A', 'Rating': None},
+                                                              {'App': 'B', 'Rating': 3.0}]
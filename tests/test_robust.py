@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from app_profiles import robust
+from app_profiles.aggregate import quantile
+from app_profiles.robust import (
+    order_quantile,
+    rank_sum,
+    robust_stats,
+    select,
+    trimmed_mean,
+)
+
+
+def values(n, seed):
+    generator = random.Random(seed)
+    return [int(generator.paretovariate(1.2) * 100) for _ in range(n)]
+
+
+@pytest.fixture(params=['numpy', 'sort'])
+def backend(request, monkeypatch):
+    if request.param == 'sort':
+        monkeypatch.setattr(robust, '_numpy', lambda: None)
+    return request.param
+
+
+def test_order_statistics_match_sorting(backend):
+    for n in (1, 2, 63, 64, 500):
+        data = values(n, n)
+        ordered = sorted(data)
+        assert [select(data, k) for k in range(0, n, 7)] == ordered[::7]
+        assert rank_sum(data, n // 4, n - n // 4) == sum(ordered[n // 4:n - n // 4])
+        assert order_quantile(data, 0.3) == quantile(ordered, 0.3)
+
+
+def test_robust_stats_match_sorting(backend):
+    generator = random.Random(1)
+    groups = [generator.choice('abc') for _ in range(3000)]
+    data = values(3000, 2)
+    table = robust_stats(groups, data, trim=0.2, limit=1000)
+    for group in 'abc':
+        ordered = sorted(value for name, value in zip(groups, data) if name == group)
+        cut = int(len(ordered) * 0.2)
+        first, third = quantile(ordered, 0.25), quantile(ordered, 0.75)
+        kept = [value for value in ordered if first - 1.5 * (third - first) <= value
+                <= third + 1.5 * (third - first) and value < 1000]
+        assert table[group]['median'] == quantile(ordered, 0.5)
+        assert table[group]['trimmed_mean'] == pytest.approx(
+            sum(ordered[cut:len(ordered) - cut]) / (len(ordered) - 2 * cut))
+        assert table[group]['outlier_mean'] == pytest.approx(sum(kept) / len(kept))
+        assert table[group]['outliers'] == len(ordered) - len(kept)
+
+
+def test_trim_must_leave_values():
+    assert trimmed_mean([1, 2, 3, 100], 0.49) == 2.5
+    for trim in (0.5, -0.1):
+        with pytest.raises(ValueError):
+            trimmed_mean([1, 2, 3, 4], trim)
+        with pytest.raises(ValueError):
+            robust_stats(['a'], [1], trim=trim)
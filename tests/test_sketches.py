@@ -0,0 +1,82 @@
+import math
+import random
+from collections import Counter
+
+from app_profiles.columns import ANDROID_SCHEMA
+from app_profiles.sketches import HyperLogLog, SpaceSaving, TDigest, summarize_feed
+
+
+def skewed_stream(n, n_values=500, seed=9):
+    """Seeded stream of ``n`` values with Zipf-like frequencies."""
+    generator = random.Random(seed)
+    weights = [1 / rank for rank in range(1, n_values + 1)]
+    return generator.choices(['genre%d' % rank for rank in range(n_values)], weights, k=n)
+
+
+def test_space_saving_error_bound():
+    stream = skewed_stream(20000)
+    exact = Counter(stream)
+    sketch = SpaceSaving(k=50)
+    for item in stream:
+        sketch.add(item)
+
+    bound = sketch.error_bound()
+    assert bound == len(stream) // 50
+    reported = {item: count for count, item in sketch.top()}
+    for item, count in reported.items():
+        assert exact[item] <= count <= exact[item] + bound
+    for item, count in exact.items():
+        if count > len(stream) / 50:
+            assert item in reported
+
+
+def test_space_saving_sums_of_monitored_groups():
+    sketch = SpaceSaving(k=10)
+    for item in ['a', 'b', 'a', 'a']:
+        sketch.add(item, 2)
+    assert sketch.counters['a'][2:] == [3, 6]
+
+
+def test_hyperloglog_relative_error():
+    for n in (100, 5000, 50000):
+        sketch = HyperLogLog(precision=12)
+        for index in range(n):
+            sketch.add('app%d' % index)
+            sketch.add('app%d' % (index // 2))  # repeated values are not counted twice
+        standard_error = 1.04 / math.sqrt(2 ** 12)
+        assert abs(sketch.count() - n) <= 3 * standard_error * n
+
+
+def test_hyperloglog_merge_counts_the_union():
+    first = HyperLogLog(precision=10)
+    second = HyperLogLog(precision=10)
+    for index in range(3000):
+        first.add(index)
+        second.add(index + 1500)
+    first.merge(second)
+    assert abs(first.count() - 4500) <= 3 * 1.04 / math.sqrt(2 ** 10) * 4500
+
+
+def test_tdigest_rank_error():
+    generator = random.Random(11)
+    values = [generator.lognormvariate(8, 2) for _ in range(20000)]
+    first = TDigest()
+    second = TDigest()
+    for index, value in enumerate(values):
+        (first if index % 2 else second).add(value)
+    first.merge(second)
+
+    ordered = sorted(values)
+    for q in (0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999):
+        estimate = first.quantile(q)
+        rank = sum(value <= estimate for value in ordered) / len(ordered)
+        assert abs(rank - q) < 0.01
+
+
+def test_summarize_feed_parses_values():
+    header = ['App', 'Genres', 'Installs']
+    rows = [['a', 'Puzzle', '1,000+'], ['b', 'Puzzle', '3,000+'], ['c', 'Action', '10+']]
+    summary = summarize_feed(rows, header, ANDROID_SCHEMA, 'Genres', 'Installs', 'App')
+    assert summary.group_means() == {'Puzzle': 2000, 'Action': 10}
+    assert summary.top_table() == [(2 / 3 * 100, 'Puzzle'), (1 / 3 * 100, 'Action')]
+    assert round(summary.distinct_apps()) == 3
@@ -0,0 +1,17 @@
+from app_profiles import columnar, group_by
+from app_profiles.stages import StageProfiler
+
+HEADER = ['App', 'Category', 'Installs']
+SCHEMA = {'Category': 'label', 'Installs': 'installs'}
+ROWS = [['A', 'GAME', '10+'], ['B', 'GAME', '100+'], ['C', 'TOOLS', '5+']]
+
+
+def test_rows_counted_for_tables_not_for_group_statistics():
+    with StageProfiler() as profiler:
+        table = profiler.call('columnar', columnar, ROWS, HEADER, SCHEMA)
+        profiler.call('group_by', group_by, table['Category'], table['Installs'])
+
+    assert profiler.stages['columnar']['rows_in'] == 3
+    assert profiler.stages['columnar']['rows_out'] == 3
+    assert profiler.stages['group_by']['rows_in'] == 3
+    assert profiler.stages['group_by']['rows_out'] is None
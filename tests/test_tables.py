@@ -0,0 +1,54 @@
+from array import array
+
+import pytest
+
+from app_profiles import tables
+from app_profiles.tables import (
+    code_freq_table,
+    column_freq_table,
+    encode,
+    freq_table,
+    sorted_table,
+)
+
+NAN = float('nan')
+COLUMNS = {
+    'ratings': array('d', [4.0, NAN, 4.5, NAN, 4.0, NAN]),
+    'installs': array('q', [10, 100, 10, 5, 100, 10]),
+    'genres': ['Games', 'Tools', 'Games', 'Books', 'Tools', 'Games'],
+}
+
+
+def both_backends(function, monkeypatch):
+    with_numpy = function()
+    monkeypatch.setattr(tables, '_numpy', lambda: None)
+    return with_numpy, function()
+
+
+def same(first, second):
+    """Compare tables of (percentage, value) pairs, with NaN equal to NaN."""
+    return [(percentage, repr(value)) for percentage, value in first] == \
+        [(percentage, repr(value)) for percentage, value in second]
+
+
+@pytest.mark.parametrize('name', sorted(COLUMNS))
+def test_backends_agree(name, monkeypatch):
+    pytest.importorskip('numpy')
+    column = COLUMNS[name]
+    with_numpy, without = both_backends(lambda: column_freq_table(column), monkeypatch)
+    assert same(with_numpy, without)
+    assert same(with_numpy, column_freq_table(list(column)))
+
+
+def test_nan_is_one_value():
+    assert same(column_freq_table(COLUMNS['ratings']),
+                [(3 / 6 * 100, NAN), (2 / 6 * 100, 4.0), (1 / 6 * 100, 4.5)])
+
+
+def test_coded_column_matches_rows(monkeypatch):
+    rows = [[genre] for genre in COLUMNS['genres']]
+    expected = sorted_table(freq_table(rows, 0))
+    assert column_freq_table(COLUMNS['genres']) == expected
+    with_numpy, without = both_backends(lambda: code_freq_table(*encode(COLUMNS['genres'])),
+                                        monkeypatch)
+    assert with_numpy == without == expected
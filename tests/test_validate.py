@@ -0,0 +1,26 @@
+from app_profiles import IOS_CHECKED, IOS_COLUMNS, IOS_SCHEMA, checked_columns, validated
+
+HEADER = ['id', 'track_name', 'price', 'rating_count_tot', 'user_rating', 'vpp_lic']
+
+
+def rejects(rows, columns=None):
+    found = []
+    list(validated(rows, HEADER, IOS_SCHEMA, lambda *reject: found.append(reject[:2]), columns))
+    return found
+
+
+def test_validated_checks_every_column_by_default():
+    rows = [['1', 'A', '0.0', '10', '4.5', 'x'], ['2', 'B', '0.0', '10', '7', '1']]
+    assert rejects(rows) == [(0, "vpp_lic: not a number 'x'"), (1, "user_rating: '7' out of range")]
+
+
+def test_validated_restricted_to_columns():
+    rows = [['1', 'A', '0.0', '10', '4.5', 'x'], ['2', 'B', '0.0', '10', '7', '1'], ['3', 'C']]
+    assert rejects(rows, ('price', 'user_rating')) == [(1, "user_rating: '7' out of range"),
+                                                       (2, 'expected 6 columns, got 2')]
+
+
+def test_every_parsed_column_is_checked():
+    assert set(IOS_CHECKED) == {name for name in IOS_COLUMNS
+                                if IOS_SCHEMA[name] not in ('text', 'label')}
+    assert checked_columns(IOS_SCHEMA, ['track_name', 'price', 'prime_genre']) == ('price',)